@@ -1,22 +1,48 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials
+from pydantic import TypeAdapter
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
-from app.core.database import get_db
-from app.core.security import verify_password, create_access_token, get_current_user
+import asyncio
+from app.core.database import AsyncSessionLocal, get_async_db
+from app.core.security import (
+    verify_password, create_access_token, get_current_user,
+    invalidate_token_cache, security,
+)
 from app.models.user import User
 from app.schemas.schemas import LoginRequest, LoginResponse, UserResponse
 
 router = APIRouter()
 
+# Built once; reused for every login and /me response
+_USER_ADAPTER = TypeAdapter(UserResponse)
+
+async def update_last_login(user_id, login_time: datetime):
+    """Persist last_login outside the request (runs as a background task)."""
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            update(User).where(User.id == user_id).values(last_login=login_time)
+        )
+        await db.commit()
+
 @router.post("/login", response_model=LoginResponse)
-async def login(credentials: LoginRequest, db: Session = Depends(get_db)):
+async def login(
+    credentials: LoginRequest,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db)
+):
     """
     Authenticate user and return JWT token.
     """
     # Find user by email
-    user = db.query(User).filter(User.email == credentials.email).first()
+    result = await db.execute(select(User).where(User.email == credentials.email))
+    user = result.scalar_one_or_none()
     
-    if not user or not verify_password(credentials.password, user.password_hash):
+    # bcrypt is deliberately slow; keep it off the event loop
+    if not user or not await asyncio.to_thread(
+        verify_password, credentials.password, user.password_hash
+    ):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -30,23 +56,28 @@ async def login(credentials: LoginRequest, db: Session = Depends(get_db)):
             detail="Account is not active"
         )
     
-    # Update last login
-    user.last_login = datetime.utcnow()
-    db.commit()
+    # Update last login after the response is sent
+    login_time = datetime.utcnow()
+    user.last_login = login_time  # reflected in the response, not flushed here
+    background_tasks.add_task(update_last_login, user.id, login_time)
     
     # Create access token
     access_token = create_access_token(data={"sub": str(user.id)})
     
     # Prepare user response
-    user_response = UserResponse.model_validate(user)
+    user_response = _USER_ADAPTER.validate_python(user, from_attributes=True)
     
     return LoginResponse(token=access_token, user=user_response)
 
 @router.post("/logout")
-async def logout(current_user: User = Depends(get_current_user)):
+async def logout(
+    current_user: User = Depends(get_current_user),
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+):
     """
     Logout user (client should remove token).
     """
+    await invalidate_token_cache(credentials.credentials)
     return {"message": "Successfully logged out"}
 
 @router.get("/me", response_model=UserResponse)
@@ -54,4 +85,4 @@ async def get_current_user_info(current_user: User = Depends(get_current_user)):
     """
     Get current authenticated user information.
     """
-    return UserResponse.model_validate(current_user)
\ No newline at end of file
+    return _USER_ADAPTER.validate_python(current_user, from_attributes=True)
\ No newline at end of file
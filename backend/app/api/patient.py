@@ -2,72 +2,147 @@
 Patient API Routes
 """
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import text
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import ORJSONResponse
+from cachetools import TTLCache
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import raiseload
+from sqlalchemy import select, text
 from uuid import UUID
-from app.core.database import get_db
+from app.core.database import get_async_db
+from app.core.etag import detail_etag, not_modified
 from app.core.security import require_role
+from app.core.streaming import stream_rows
+from app.services.gcs_storage import gcs_storage, load_json_images, refresh_presigned_urls
 from app.models.user import User
 from app.models.patient_profile import PatientProfile
+from app.services.report_templates import capitalize_for_display, EXAM_TYPE_DISPLAY
+import hashlib
 import logging
+import orjson
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-# Helper to capitalize for display
-def capitalize_for_display(value: str, field_type: str) -> str:
-    """Capitalize lowercase enum values for UI display."""
-    if field_type == 'examination_type':
-        return {'xray': 'X-ray', 'ct': 'CT', 'mri': 'MRI', 'pet': 'PET', 'ultrasound': 'Ultrasound'}.get(value, value)
-    elif field_type in ['body_region', 'urgency_level']:
-        return value.capitalize()
-    return value
+# Serialized /profile payloads per user: (body, etag). Short TTL since
+# profile data changes outside this API (admin/DB edits).
+_PROFILE_CACHE = TTLCache(maxsize=10_000, ttl=30)
+_PROFILE_CACHE_CONTROL = "private, max-age=30"
+
+# Statements are built once at import rather than per request
+_SCANS_SQL = text("""
+    SELECT 
+        s.id, s.scan_number, s.examination_type, s.body_region,
+        s.urgency_level, s.status, s.scan_date, s.created_at,
+        COALESCE(s.presenting_symptoms, ARRAY[]::text[]) AS presenting_symptoms,
+        s.clinical_notes
+    FROM scans s
+    JOIN patient_profiles pp ON s.patient_id = pp.id
+    WHERE pp.user_id = :user_id
+    ORDER BY s.scan_date DESC
+""")
+
+_SCAN_DETAIL_SQL = text("""
+    SELECT 
+        s.id, s.scan_number, s.examination_type, s.body_region,
+        s.urgency_level, s.status, s.scan_date, s.updated_at, s.clinical_notes,
+        COALESCE(s.presenting_symptoms, ARRAY[]::text[]) AS presenting_symptoms,
+        COALESCE(s.current_medications, ARRAY[]::text[]) AS current_medications,
+        COALESCE(s.previous_surgeries, ARRAY[]::text[]) AS previous_surgeries,
+        pp.patient_id,
+        u.full_name as patient_name,
+        COALESCE((
+            SELECT json_agg(json_build_object(
+                'image_path', si.image_path,
+                'file_size_bytes', si.file_size_bytes,
+                'image_format', si.image_format,
+                'image_order', si.image_order,
+                'signed_url', si.signed_url,
+                'signed_url_expires_at', si.signed_url_expires_at
+            ) ORDER BY si.image_order)
+            FROM scan_images si
+            WHERE si.scan_id = s.id
+        ), '[]'::json) AS images
+    FROM scans s
+    JOIN patient_profiles pp ON s.patient_id = pp.id
+    JOIN users u ON pp.user_id = u.id
+    WHERE s.id = :scan_id AND pp.user_id = :user_id
+""")
+
+_REPORTS_SQL = text("""
+    SELECT 
+        r.id, r.report_number, r.report_title, 
+        r.report_status, r.published_at, r.created_at,
+        s.scan_number, s.examination_type, s.body_region, s.scan_date
+    FROM reports r
+    JOIN scans s ON r.scan_id = s.id
+    JOIN patient_profiles pp ON s.patient_id = pp.id
+    WHERE pp.user_id = :user_id
+      AND r.report_status = 'published'
+    ORDER BY r.published_at DESC
+""")
+
+_REPORT_DETAIL_SQL = text("""
+    SELECT 
+        r.id, r.report_number, r.report_title, r.clinical_indication,
+        r.technique, r.findings, r.impression, r.recommendations,
+        r.report_status, r.published_at, r.created_at, r.updated_at,
+        s.scan_number, s.examination_type, s.body_region, s.scan_date,
+        u.full_name as patient_name
+    FROM reports r
+    JOIN scans s ON r.scan_id = s.id
+    JOIN patient_profiles pp ON s.patient_id = pp.id
+    JOIN users u ON pp.user_id = u.id
+    WHERE r.id = :report_id 
+      AND pp.user_id = :user_id
+      AND r.report_status = 'published'
+""")
+
+
+def _scan_row(row) -> dict:
+    """Shape a scans row for the list response."""
+    return {
+        "id": row["id"],
+        "scan_number": row["scan_number"],
+        "examination_type": EXAM_TYPE_DISPLAY.get(row["examination_type"], row["examination_type"]),
+        "body_region": row["body_region"].capitalize(),
+        "urgency_level": row["urgency_level"].capitalize(),
+        "status": row["status"],
+        "scan_date": row["scan_date"],
+        "created_at": row["created_at"],
+        "presenting_symptoms": row["presenting_symptoms"],
+        "clinical_notes": row["clinical_notes"]
+    }
+
+
+def _report_row(row) -> dict:
+    """Shape a reports row for the list response."""
+    return {
+        "id": row["id"],
+        "report_number": row["report_number"],
+        "report_title": row["report_title"],
+        "report_status": row["report_status"],
+        "published_at": row["published_at"],
+        "created_at": row["created_at"],
+        "scan_number": row["scan_number"],
+        "examination_type": EXAM_TYPE_DISPLAY.get(row["examination_type"], row["examination_type"]),
+        "body_region": row["body_region"].capitalize(),
+        "scan_date": row["scan_date"]
+    }
 
 
 @router.get("/scans")
 async def get_patient_scans(
-    current_user: User = Depends(require_role(["patient"])),
-    db: Session = Depends(get_db)
+    format: str = Query("array", pattern="^(array|ndjson)$"),
+    current_user: User = Depends(require_role(["patient"]))
 ):
-    """Get all scans for the current patient."""
+    """Get all scans for the current patient (streamed)."""
     try:
-        # Get patient profile
-        patient_profile = db.query(PatientProfile).filter(
-            PatientProfile.user_id == current_user.id
-        ).first()
-        
-        if not patient_profile:
-            return []
-        
-        # Query scans
-        result = db.execute(text("""
-            SELECT 
-                s.id, s.scan_number, s.examination_type, s.body_region,
-                s.urgency_level, s.status, s.scan_date, s.created_at,
-                s.presenting_symptoms, s.clinical_notes
-            FROM scans s
-            WHERE s.patient_id = :patient_id
-            ORDER BY s.scan_date DESC
-        """), {"patient_id": str(patient_profile.id)})
-        
-        scans = []
-        for row in result:
-            scans.append({
-                "id": str(row.id),
-                "scan_number": row.scan_number,
-                "examination_type": capitalize_for_display(row.examination_type, 'examination_type'),
-                "body_region": capitalize_for_display(row.body_region, 'body_region'),
-                "urgency_level": capitalize_for_display(row.urgency_level, 'urgency_level'),
-                "status": row.status,
-                "scan_date": row.scan_date.isoformat(),
-                "created_at": row.created_at.isoformat(),
-                "presenting_symptoms": row.presenting_symptoms or [],
-                "clinical_notes": row.clinical_notes
-            })
-        
-        logger.info(f"Retrieved {len(scans)} scans for patient {patient_profile.patient_id}")
-        return scans
+        # Query scans (patient profile resolved in the same round trip)
+        return await stream_rows(
+            _SCANS_SQL, {"user_id": current_user.id}, _scan_row,
+            format, f"scans for user {current_user.id}"
+        )
         
     except Exception as e:
         logger.error(f"Failed to get patient scans: {e}")
@@ -77,59 +152,52 @@ async def get_patient_scans(
 @router.get("/scans/{scan_id}")
 async def get_scan_details(
     scan_id: UUID,
+    request: Request,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(require_role(["patient"])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get detailed information about a specific scan."""
     try:
-        from app.services.gcs_storage import gcs_storage
-        
-        # Get patient profile
-        patient_profile = db.query(PatientProfile).filter(
-            PatientProfile.user_id == current_user.id
-        ).first()
-        
-        if not patient_profile:
-            raise HTTPException(status_code=404, detail="Patient profile not found")
-        
-        # Get scan details
-        result = db.execute(text("""
-            SELECT 
-                s.*, pp.patient_id,
-                u.first_name || ' ' || u.last_name as patient_name
-            FROM scans s
-            JOIN patient_profiles pp ON s.patient_id = pp.id
-            JOIN users u ON pp.user_id = u.id
-            WHERE s.id = :scan_id AND s.patient_id = :patient_id
-        """), {
-            "scan_id": str(scan_id),
-            "patient_id": str(patient_profile.id)
+        # Get scan details (images aggregated in the same query)
+        result = await db.execute(_SCAN_DETAIL_SQL, {
+            "scan_id": scan_id,
+            "user_id": current_user.id
         })
         
         row = result.fetchone()
         if not row:
             raise HTTPException(status_code=404, detail="Scan not found")
         
-        # Get images with signed URLs
-        images_result = db.execute(text("""
-            SELECT image_path, file_size_bytes, image_format, image_order
-            FROM scan_images
-            WHERE scan_id = :scan_id
-            ORDER BY image_order
-        """), {"scan_id": str(scan_id)})
+        # Attach signed URLs
+        image_rows = load_json_images(row.images)
+        signed_urls, stale_paths = await gcs_storage.resolve_image_urls(image_rows)
+        if stale_paths:
+            background_tasks.add_task(refresh_presigned_urls, stale_paths)
+        
+        # Only cacheable when every URL is a stored pre-signed one; freshly
+        # signed URLs differ per request and may outlive a revalidated copy.
+        headers = {}
+        if not stale_paths:
+            etag = detail_etag(
+                row.id, row.updated_at,
+                *(int(img["signed_url_expires_at"].timestamp()) for img in image_rows)
+            )
+            headers, cached = not_modified(request, etag)
+            if cached:
+                return cached
         
         images = []
-        for img in images_result:
-            signed_url = gcs_storage.get_signed_url(img.image_path, expiration=3600)
+        for img, signed_url in zip(image_rows, signed_urls):
             images.append({
                 "url": signed_url,
-                "size": img.file_size_bytes,
-                "format": img.image_format,
-                "order": img.image_order
+                "size": img["file_size_bytes"],
+                "format": img["image_format"],
+                "order": img["image_order"]
             })
         
-        return {
-            "id": str(row.id),
+        return ORJSONResponse({
+            "id": row.id,
             "scan_number": row.scan_number,
             "patient_name": row.patient_name,
             "patient_id": row.patient_id,
@@ -137,13 +205,13 @@ async def get_scan_details(
             "body_region": capitalize_for_display(row.body_region, 'body_region'),
             "urgency_level": capitalize_for_display(row.urgency_level, 'urgency_level'),
             "status": row.status,
-            "scan_date": row.scan_date.isoformat(),
-            "presenting_symptoms": row.presenting_symptoms or [],
-            "current_medications": row.current_medications or [],
-            "previous_surgeries": row.previous_surgeries or [],
+            "scan_date": row.scan_date,
+            "presenting_symptoms": row.presenting_symptoms,
+            "current_medications": row.current_medications,
+            "previous_surgeries": row.previous_surgeries,
             "clinical_notes": row.clinical_notes,
             "images": images
-        }
+        }, headers=headers)
         
     except HTTPException:
         raise
@@ -154,49 +222,16 @@ async def get_scan_details(
 
 @router.get("/reports")
 async def get_patient_reports(
-    current_user: User = Depends(require_role(["patient"])),
-    db: Session = Depends(get_db)
+    format: str = Query("array", pattern="^(array|ndjson)$"),
+    current_user: User = Depends(require_role(["patient"]))
 ):
-    """Get all published reports for the current patient."""
+    """Get all published reports for the current patient (streamed)."""
     try:
-        # Get patient profile
-        patient_profile = db.query(PatientProfile).filter(
-            PatientProfile.user_id == current_user.id
-        ).first()
-        
-        if not patient_profile:
-            return []
-        
         # Query published reports
-        result = db.execute(text("""
-            SELECT 
-                r.id, r.report_number, r.report_title, 
-                r.report_status, r.published_at, r.created_at,
-                s.scan_number, s.examination_type, s.body_region, s.scan_date
-            FROM reports r
-            JOIN scans s ON r.scan_id = s.id
-            WHERE s.patient_id = :patient_id
-              AND r.report_status = 'published'
-            ORDER BY r.published_at DESC
-        """), {"patient_id": str(patient_profile.id)})
-        
-        reports = []
-        for row in result:
-            reports.append({
-                "id": str(row.id),
-                "report_number": row.report_number,
-                "report_title": row.report_title,
-                "report_status": row.report_status,
-                "published_at": row.published_at.isoformat() if row.published_at else None,
-                "created_at": row.created_at.isoformat(),
-                "scan_number": row.scan_number,
-                "examination_type": capitalize_for_display(row.examination_type, 'examination_type'),
-                "body_region": capitalize_for_display(row.body_region, 'body_region'),
-                "scan_date": row.scan_date.isoformat()
-            })
-        
-        logger.info(f"Retrieved {len(reports)} reports for patient {patient_profile.patient_id}")
-        return reports
+        return await stream_rows(
+            _REPORTS_SQL, {"user_id": current_user.id}, _report_row,
+            format, f"reports for user {current_user.id}"
+        )
         
     except Exception as e:
         logger.error(f"Failed to get patient reports: {e}")
@@ -206,43 +241,28 @@ async def get_patient_reports(
 @router.get("/reports/{report_id}")
 async def get_report_details(
     report_id: UUID,
+    request: Request,
     current_user: User = Depends(require_role(["patient"])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get detailed information about a specific report."""
     try:
-        # Get patient profile
-        patient_profile = db.query(PatientProfile).filter(
-            PatientProfile.user_id == current_user.id
-        ).first()
-        
-        if not patient_profile:
-            raise HTTPException(status_code=404, detail="Patient profile not found")
-        
         # Query report with verification that it belongs to this patient
-        result = db.execute(text("""
-            SELECT 
-                r.*, s.scan_number, s.examination_type, s.body_region,
-                s.scan_date, s.patient_id,
-                u.first_name || ' ' || u.last_name as patient_name
-            FROM reports r
-            JOIN scans s ON r.scan_id = s.id
-            JOIN patient_profiles pp ON s.patient_id = pp.id
-            JOIN users u ON pp.user_id = u.id
-            WHERE r.id = :report_id 
-              AND s.patient_id = :patient_id
-              AND r.report_status = 'published'
-        """), {
-            "report_id": str(report_id),
-            "patient_id": str(patient_profile.id)
+        result = await db.execute(_REPORT_DETAIL_SQL, {
+            "report_id": report_id,
+            "user_id": current_user.id
         })
         
         row = result.fetchone()
         if not row:
             raise HTTPException(status_code=404, detail="Report not found or not published")
         
-        return {
-            "id": str(row.id),
+        headers, cached = not_modified(request, detail_etag(row.id, row.updated_at))
+        if cached:
+            return cached
+        
+        return ORJSONResponse({
+            "id": row.id,
             "report_number": row.report_number,
             "report_title": row.report_title,
             "clinical_indication": row.clinical_indication,
@@ -251,14 +271,14 @@ async def get_report_details(
             "impression": row.impression,
             "recommendations": row.recommendations,
             "report_status": row.report_status,
-            "published_at": row.published_at.isoformat() if row.published_at else None,
-            "created_at": row.created_at.isoformat(),
+            "published_at": row.published_at,
+            "created_at": row.created_at,
             "scan_number": row.scan_number,
             "patient_name": row.patient_name,
             "examination_type": capitalize_for_display(row.examination_type, 'examination_type'),
             "body_region": capitalize_for_display(row.body_region, 'body_region'),
-            "scan_date": row.scan_date.isoformat()
-        }
+            "scan_date": row.scan_date
+        }, headers=headers)
         
     except HTTPException:
         raise
@@ -269,55 +289,85 @@ async def get_report_details(
 
 @router.get("/profile")
 async def get_patient_profile(
+    request: Request,
     current_user: User = Depends(require_role(["patient"])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get comprehensive patient profile information."""
     try:
-        patient_profile = db.query(PatientProfile).filter(
-            PatientProfile.user_id == current_user.id
-        ).first()
-        
-        if not patient_profile:
-            return {
-                "user_id": str(current_user.id),
-                "first_name": current_user.first_name,
-                "last_name": current_user.last_name,
-                "email": current_user.email,
-                "phone": current_user.phone,
-                "date_of_birth": current_user.date_of_birth,
-                "patient_id": None,
-                "age_years": None,
-                "weight_kg": None,
-                "height_cm": None,
-                "gender": None,
-                "blood_type": None,
-                "allergies": [],
-                "emergency_contact_name": None,
-                "emergency_contact_phone": None,
-                "medical_history": None,
-            }
+        cached = _PROFILE_CACHE.get(current_user.id)
+        if cached is None:
+            cached = _encode_profile(await _build_profile(current_user, db))
+            _PROFILE_CACHE[current_user.id] = cached
         
+        body, etag = cached
+        headers = {"Cache-Control": _PROFILE_CACHE_CONTROL, "ETag": etag}
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
+    except Exception as e:
+        logger.error(f"ERROR in get_patient_profile: {str(e)}") 
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"Error fetching profile: {str(e)}")
+
+
+def invalidate_profile_cache(user_id) -> None:
+    """Drop a cached profile; call from any path that edits profile data."""
+    _PROFILE_CACHE.pop(user_id, None)
+
+
+def _encode_profile(profile: dict) -> tuple:
+    """Serialize a profile once and derive its ETag from the bytes."""
+    body = orjson.dumps(profile)
+    return body, '"' + hashlib.sha1(body).hexdigest() + '"'
+
+
+async def _build_profile(current_user: User, db: AsyncSession) -> dict:
+    """Assemble the profile payload for a patient user."""
+    # User fields come from current_user, so PatientProfile.user is not loaded
+    result = await db.execute(
+        select(PatientProfile)
+        .options(raiseload('*'))
+        .where(PatientProfile.user_id == current_user.id)
+    )
+    patient_profile = result.scalar_one_or_none()
+    
+    if not patient_profile:
         return {
-            "user_id": str(current_user.id),
+            "user_id": current_user.id,
             "first_name": current_user.first_name,
             "last_name": current_user.last_name,
             "email": current_user.email,
             "phone": current_user.phone,
             "date_of_birth": current_user.date_of_birth,
-            "patient_id": patient_profile.patient_id,
-            "age_years": patient_profile.age_years,
-            "weight_kg": float(patient_profile.weight_kg) if patient_profile.weight_kg else None,
-            "height_cm": float(patient_profile.height_cm) if patient_profile.height_cm else None,
-            "gender": str(patient_profile.gender) if patient_profile.gender else None,
-            "blood_type": patient_profile.blood_type,
-            "allergies": patient_profile.allergies or [],
-            "emergency_contact_name": patient_profile.emergency_contact_name,
-            "emergency_contact_phone": patient_profile.emergency_contact_phone,
-            "medical_history": patient_profile.medical_history,
+            "patient_id": None,
+            "age_years": None,
+            "weight_kg": None,
+            "height_cm": None,
+            "gender": None,
+            "blood_type": None,
+            "allergies": [],
+            "emergency_contact_name": None,
+            "emergency_contact_phone": None,
+            "medical_history": None,
         }
-    except Exception as e:
-        logger.error(f"ERROR in get_patient_profile: {str(e)}") 
-        import traceback
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=f"Error fetching profile: {str(e)}")
\ No newline at end of file
+    
+    return {
+        "user_id": current_user.id,
+        "first_name": current_user.first_name,
+        "last_name": current_user.last_name,
+        "email": current_user.email,
+        "phone": current_user.phone,
+        "date_of_birth": current_user.date_of_birth,
+        "patient_id": patient_profile.patient_id,
+        "age_years": patient_profile.age_years,
+        "weight_kg": float(patient_profile.weight_kg) if patient_profile.weight_kg else None,
+        "height_cm": float(patient_profile.height_cm) if patient_profile.height_cm else None,
+        "gender": str(patient_profile.gender) if patient_profile.gender else None,
+        "blood_type": patient_profile.blood_type,
+        "allergies": patient_profile.allergies or [],
+        "emergency_contact_name": patient_profile.emergency_contact_name,
+        "emergency_contact_phone": patient_profile.emergency_contact_phone,
+        "medical_history": patient_profile.medical_history,
+    }
@@ -2,19 +2,44 @@
 Radiologist API Routes
 """
 from app.core.config import settings
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
-from sqlalchemy.orm import Session
-from sqlalchemy import text
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query, Request, Response
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import raiseload
+from sqlalchemy import (
+    Integer, String, and_, bindparam, cast, column, func, literal_column, or_, select,
+    table, text, true, tuple_
+)
 from uuid import UUID
 from datetime import datetime
+from typing import Optional
+from functools import lru_cache
+from types import MappingProxyType
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import base64
+import hashlib
 import logging
-import uuid as uuid_lib
+import orjson
+import time
+from cachetools import TTLCache
 
-from app.core.database import get_db
+from app.core.cache import cache_delete, cache_delete_sync, cache_hget_raw, cache_hset_raw
+from app.core.database import AsyncSessionLocal, SessionLocal, get_async_db
+from app.core.etag import detail_etag, not_modified
 from app.core.security import require_role
+from app.core.streaming import stream_rows
+from app.worker import celery_app
+from app.services.gcs_storage import (
+    PRESIGNED_URL_REFRESH_MARGIN,
+    gcs_storage,
+    load_json_images,
+    refresh_presigned_urls,
+)
+from app.services.ml_model_service import ml_model_service
 from app.models.user import User
 from app.models.scan import Scan
-from app.models.scan_image import ScanImage
 from app.models.patient_profile import PatientProfile
 from app.models.radiologist_feedback import RadiologistFeedback
 from app.models.radiologist_profile import RadiologistProfile
@@ -30,13 +55,72 @@ from email.mime.multipart import MIMEMultipart
 # Import report generation helper
 from app.services.report_templates import (
     generate_report_template,
-    capitalize_for_display
+    capitalize_for_display,
+    EXAM_TYPE_DISPLAY
 )
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# Professional fields of radiologist_profiles per user_id. The row rarely
+# changes and is only edited outside this API.
+_RADIOLOGIST_PROFILE_CACHE = TTLCache(maxsize=1024, ttl=300)
+
+# Serialized first page of each worklist in Redis, one hash field per page
+# size. Anything that changes a scan's or report's status drops both.
+_PENDING_CACHE_KEY = "worklist:pending"
+_COMPLETED_CACHE_KEY = "worklist:completed"
+
+# Blocking part of in-process analyses (GCS download + remote model call)
+# when no Celery broker is configured
+_ML_POOL = ThreadPoolExecutor(
+    max_workers=settings.ML_ANALYSIS_WORKERS,
+    thread_name_prefix="ai-analysis"
+)
+
+
+# ML / radiologist labels -> diagnosis_class enum value (built once).
+# Mirrored by the diagnosis_synonyms table used by the AI workflow.
+_DIAGNOSIS_MAP = MappingProxyType({
+    # Normal cases
+    'normal': 'normal',
+    'no finding': 'normal',
+    'negative': 'normal',
+    # TB cases
+    'tuberculosis': 'tuberculosis',
+    'tb': 'tuberculosis',
+    'positive': 'tuberculosis',
+    # Lung cancer cases
+    'adenocarcinoma': 'lung_cancer',
+    'squamous_cell_carcinoma': 'lung_cancer',
+    'squamous_cell': 'lung_cancer',
+    'large_cell_carcinoma': 'lung_cancer',
+    'large_cell': 'lung_cancer',
+    'lung_cancer': 'lung_cancer',
+    'malignant': 'lung_cancer',
+    'benign': 'lung_cancer',
+    # Inconclusive
+    'inconclusive': 'inconclusive',
+    'uncertain': 'inconclusive',
+    'unknown': 'inconclusive',
+})
+
+_DIAGNOSIS_DISPLAY = MappingProxyType({
+    'normal': 'Normal',
+    'tuberculosis': 'Tuberculosis',
+    'lung_cancer': 'Lung Cancer',
+    'other_abnormality': 'Other Abnormality',
+    'inconclusive': 'Inconclusive'
+})
+
 
+# (examination_type, body_region) -> model served for that combination
+_MODEL_MAP = MappingProxyType({
+    ('xray', 'chest'): MappingProxyType({'type': 'tb', 'name': 'TB Detection Model'}),
+    ('ct', 'chest'): MappingProxyType({'type': 'lung_cancer', 'name': 'Lung Cancer Model'}),
+})
+
+@lru_cache(maxsize=64)
 def normalize_diagnosis(ml_prediction: str) -> str:
     """
     Normalize ML model prediction to LOWERCASE diagnosis_class enum.
@@ -44,207 +128,613 @@ def normalize_diagnosis(ml_prediction: str) -> str:
     Database values: 'normal', 'tuberculosis', 'lung_cancer', 
                     'other_abnormality', 'inconclusive'
     """
-    pred_lower = ml_prediction.lower()
-    
-    # Normal cases
-    if pred_lower in ['normal', 'no finding', 'negative']:
-        return 'normal'
-    
-    # TB cases
-    elif pred_lower in ['tuberculosis', 'tb', 'positive']:
-        return 'tuberculosis'
-    
-    # Lung cancer cases  
-    elif pred_lower in ['adenocarcinoma', 'squamous_cell_carcinoma', 'squamous_cell',
-                        'large_cell_carcinoma', 'large_cell', 'lung_cancer', 'malignant',
-                        'benign']:
-        return 'lung_cancer'
-    
-    # Inconclusive
-    elif pred_lower in ['inconclusive', 'uncertain', 'unknown']:
-        return 'inconclusive'
-    
-    # Other abnormality
-    else:
-        return 'other_abnormality'
+    return _DIAGNOSIS_MAP.get(ml_prediction.lower(), 'other_abnormality')
 
 
+@lru_cache(maxsize=64)
 def capitalize_diagnosis_for_display(diagnosis: str) -> str:
     """Capitalize diagnosis for display in UI."""
-    display_map = {
-        'normal': 'Normal',
-        'tuberculosis': 'Tuberculosis',
-        'lung_cancer': 'Lung Cancer',
-        'other_abnormality': 'Other Abnormality',
-        'inconclusive': 'Inconclusive'
-    }
-    return display_map.get(diagnosis, diagnosis.replace('_', ' ').title())
+    return _DIAGNOSIS_DISPLAY.get(diagnosis, diagnosis.replace('_', ' ').title())
+
+
+# Read queries are built once at import rather than per request
+
+# Status filters are literal SQL, not enum binds: they must match the
+# partial index predicates verbatim for the planner to use those indexes
+# (a bound parameter can't prove the predicate under a generic plan).
+_PENDING_FILTER = text("scans.status IN ('pending', 'in_progress', 'ai_analyzed')")
+_COMPLETED_FILTER = text("scans.status = 'completed'")
+# Generated column, indexed with created_at/id by idx_scans_pending_rank (migration 007)
+_URGENCY_RANK = Scan.urgency_rank
+
+_EMPTY_ARRAY = literal_column("'{}'")
+
+# Worklist columns shared by the pending and completed lists. NULL arrays
+# and the status enum are normalized in SQL so rows need no per-field fixup.
+_WORKLIST_COLUMNS = (
+    Scan.id, Scan.scan_number, Scan.examination_type, Scan.body_region,
+    Scan.urgency_level, cast(Scan.status, String).label("status"),
+    Scan.scan_date, Scan.created_at,
+    func.coalesce(Scan.presenting_symptoms, _EMPTY_ARRAY).label("presenting_symptoms"),
+    func.coalesce(Scan.current_medications, _EMPTY_ARRAY).label("current_medications"),
+    func.coalesce(Scan.previous_surgeries, _EMPTY_ARRAY).label("previous_surgeries"),
+    PatientProfile.patient_id,
+    User.full_name.label("patient_name"),
+)
+
+# Keyset pagination: each page continues strictly after the cursor row
+# in sort order, so deep pages cost the same as the first one.
+_CURSOR_RANK = bindparam("cursor_rank", type_=Integer)
+_CURSOR_TS = bindparam("cursor_ts", type_=Scan.created_at.type)
+_CURSOR_ID = bindparam("cursor_id", type_=Scan.id.type)
+
+_PENDING_SCANS_STMT = (
+    select(*_WORKLIST_COLUMNS, _URGENCY_RANK.label("urgency_rank"))
+    .join(Scan.patient_profile)
+    .join(PatientProfile.user)
+    .where(_PENDING_FILTER)
+    .order_by(_URGENCY_RANK, Scan.created_at.desc(), Scan.id.desc())
+    .limit(bindparam("size"))
+)
+
+# Unpaged variant for ?format=ndjson (see _COMPLETED_SCANS_STREAM_STMT)
+_PENDING_SCANS_STREAM_STMT = _PENDING_SCANS_STMT.limit(None).execution_options(yield_per=100)
+
+_PENDING_AFTER_CURSOR = or_(
+    _URGENCY_RANK > _CURSOR_RANK,
+    and_(
+        _URGENCY_RANK == _CURSOR_RANK,
+        tuple_(Scan.created_at, Scan.id) < tuple_(_CURSOR_TS, _CURSOR_ID)
+    )
+)
+
+# reports has no mapped model; a lightweight table is enough for the lookup
+_reports = table("reports", column("scan_id"), column("report_status"), column("created_at"))
+
+_LATEST_REPORT = (
+    select(_reports.c.report_status)
+    .where(_reports.c.scan_id == Scan.id)
+    .order_by(_reports.c.created_at.desc())
+    .limit(1)
+    .lateral("r")
+)
+
+# Completed scans sort by review time; rows without one (legacy or bulk
+# loaded) fall back to created_at so the key, and the cursor, is never NULL.
+# Indexed as an expression by idx_scans_completed_sort (migration 010).
+_COMPLETED_SORT = func.coalesce(Scan.radiologist_review_completed_at, Scan.created_at)
+
+_COMPLETED_SCANS_STMT = (
+    select(
+        *_WORKLIST_COLUMNS,
+        _COMPLETED_SORT.label("completed_sort"),
+        func.coalesce(_LATEST_REPORT.c.report_status, literal_column("'draft'")).label("report_status"),
+    )
+    .join(Scan.patient_profile)
+    .join(PatientProfile.user)
+    .outerjoin(_LATEST_REPORT, true())
+    .where(_COMPLETED_FILTER)
+    .order_by(_COMPLETED_SORT.desc(), Scan.id.desc())
+    .limit(bindparam("size"))
+)
+
+# Unpaged variant for ?format=ndjson; rows are fetched from the server-side
+# cursor in batches as the response is written
+_COMPLETED_SCANS_STREAM_STMT = _COMPLETED_SCANS_STMT.limit(None).execution_options(yield_per=100)
+
+_COMPLETED_AFTER_CURSOR = (
+    tuple_(_COMPLETED_SORT, Scan.id) < tuple_(_CURSOR_TS, _CURSOR_ID)
+)
+
+_SCAN_DETAIL_SELECT = """
+    SELECT 
+        s.id, s.scan_number, s.examination_type, s.body_region,
+        s.urgency_level, s.status, s.scan_date, s.updated_at, s.clinical_notes,
+        COALESCE(s.presenting_symptoms, '{}') AS presenting_symptoms,
+        COALESCE(s.current_medications, '{}') AS current_medications,
+        COALESCE(s.previous_surgeries, '{}') AS previous_surgeries,
+        pp.patient_id, pp.age_years,
+        u.full_name as patient_name,
+        COALESCE((
+            SELECT json_agg(json_build_object(
+                'image_path', si.image_path,
+                'file_size_bytes', si.file_size_bytes,
+                'image_format', si.image_format,
+                'image_order', si.image_order,
+                'signed_url', si.signed_url,
+                'signed_url_expires_at', si.signed_url_expires_at
+            ) ORDER BY si.image_order)
+            FROM scan_images si
+            WHERE si.scan_id = s.id
+        ), '[]'::json) AS images
+    FROM scans s
+    JOIN patient_profiles pp ON s.patient_id = pp.id
+    JOIN users u ON pp.user_id = u.id
+"""
+
+_SCAN_DETAIL_SQL = text(_SCAN_DETAIL_SELECT + "    WHERE s.id = :scan_id\n")
+
+_SCANS_BATCH_SQL = text(_SCAN_DETAIL_SELECT + "    WHERE s.id = ANY(:ids)\n")
+
+# Upper bound on ids accepted by /scans/batch
+_MAX_BATCH_SCANS = 100
+
+_LATEST_PREDICTION_SQL = text("""
+    SELECT 
+        id, predicted_class, confidence_score, class_probabilities,
+        inference_timestamp, model_name
+    FROM ai_predictions
+    WHERE scan_id = :scan_id
+    ORDER BY inference_timestamp DESC
+    LIMIT 1
+""")
+
+_LATEST_GRADCAM_SQL = text("""
+    SELECT id, overlay_url, overlay_path, heatmap_url, heatmap_path
+    FROM gradcam_outputs
+    WHERE ai_prediction_id = :ai_pred_id
+    ORDER BY created_at DESC
+    LIMIT 1
+""")
+
+_FIRST_IMAGE_SQL = text("""
+    SELECT image_path
+    FROM scan_images
+    WHERE scan_id = :scan_id
+    ORDER BY image_order
+    LIMIT 1
+""")
+
+# Latest report (if any), scan/patient, radiologist and - only when there is
+# no report yet, for the template - the latest AI prediction in one round trip
+_DRAFT_REPORT_SQL = text("""
+    SELECT 
+        s.scan_number, s.examination_type,
+        u.full_name as patient_name,
+        r.id AS report_id, r.report_number, r.report_title, r.clinical_indication,
+        r.technique, r.findings, r.impression, r.recommendations,
+        r.report_status, r.created_at, r.published_at,
+        rad_u.full_name as radiologist_name,
+        rad_p.license_number, rad_p.specialization,
+        ap.predicted_class, ap.confidence_score
+    FROM scans s
+    JOIN patient_profiles pp ON s.patient_id = pp.id
+    JOIN users u ON pp.user_id = u.id
+    LEFT JOIN LATERAL (
+        SELECT id, report_number, report_title, clinical_indication,
+               technique, findings, impression, recommendations,
+               report_status, created_at, published_at
+        FROM reports
+        WHERE scan_id = s.id
+        ORDER BY created_at DESC
+        LIMIT 1
+    ) r ON true
+    LEFT JOIN LATERAL (
+        SELECT predicted_class, confidence_score
+        FROM ai_predictions
+        WHERE scan_id = s.id AND r.id IS NULL
+        ORDER BY inference_timestamp DESC
+        LIMIT 1
+    ) ap ON true
+    LEFT JOIN radiologist_profiles rad_p ON rad_p.user_id = :radiologist_id
+    LEFT JOIN users rad_u ON rad_p.user_id = rad_u.id
+    WHERE s.id = :scan_id
+""")
+
+_FEEDBACK_KEYS_SQL = text("""
+    SELECT s.id AS scan_id, s.scan_number, rp.id AS rad_id
+    FROM scans s
+    LEFT JOIN radiologist_profiles rp ON rp.user_id = :user_id
+    WHERE s.id = :scan_id
+""")
+
+_COMPLETE_SCAN_SQL = text("""
+    UPDATE scans
+    SET status = 'completed', radiologist_review_completed_at = NOW()
+    WHERE id = :scan_id
+""")
+
+
+# Written by run_ai_analysis(_workflow). The gradcam_outputs insert is a
+# no-op when the model returned no heatmap (:gradcam_url is NULL).
+_SAVE_ANALYSIS_SQL = text("""
+    WITH p AS (
+        INSERT INTO ai_predictions (
+            scan_id, model_name, model_version,
+            predicted_class, confidence_score, class_probabilities,
+            inference_timestamp
+        )
+        SELECT
+            :scan_id, :model, :version,
+            COALESCE(
+                (SELECT canonical FROM diagnosis_synonyms WHERE raw = lower(:class)),
+                'other_abnormality'
+            )::prediction_class,
+            :confidence, CAST(:probs AS JSONB), NOW()
+        RETURNING id, predicted_class
+    ), g AS (
+        INSERT INTO gradcam_outputs (
+            ai_prediction_id, scan_image_id,
+            heatmap_path, heatmap_url, overlay_path, overlay_url,
+            target_class
+        )
+        SELECT
+            p.id, :scan_img_id,
+            :gradcam_url, :gradcam_url, :gradcam_url, :gradcam_url,
+            p.predicted_class
+        FROM p
+        WHERE CAST(:gradcam_url AS TEXT) IS NOT NULL
+    ), u AS (
+        UPDATE scans
+        SET status = 'ai_analyzed', ai_analysis_completed_at = NOW()
+        WHERE id = :scan_id
+    )
+    SELECT predicted_class::text FROM p
+""")
+
+_START_ANALYSIS_SQL = text("""
+    UPDATE scans
+    SET status = 'in_progress', ai_analysis_started_at = NOW()
+    WHERE id = :scan_id
+""")
+
+_RESET_ANALYSIS_SQL = text("""
+    UPDATE scans SET status = 'pending' WHERE id = :scan_id
+""")
+
+_ANALYSIS_INPUTS_SQL = text("""
+    SELECT 
+        s.scan_number, pp.patient_id AS patient_code,
+        si.id AS image_id, si.image_path
+    FROM scans s
+    JOIN patient_profiles pp ON s.patient_id = pp.id
+    LEFT JOIN scan_images si ON si.scan_id = s.id AND si.image_order = 1
+    WHERE s.id = :scan_id
+""")
+_INSERT_DRAFT_REPORT_SQL = text("""
+    INSERT INTO reports (
+        scan_id, report_number, report_type, report_status,
+        report_title, clinical_indication, technique,
+        findings, impression, recommendations,
+        created_at, updated_at
+    ) VALUES (
+        :scan_id, :report_number, 'preliminary_ai', 'draft',
+        :title, :indication, :technique,
+        :findings, :impression, :recommendations,
+        NOW(), NOW()
+    )
+    ON CONFLICT (report_number) DO NOTHING
+    RETURNING id, report_number, report_status, created_at, published_at
+""")
+
+# NULL params leave the column unchanged, so one statement covers every
+# combination of edited fields
+_UPDATE_REPORT_SQL = text("""
+    UPDATE reports
+    SET report_title = COALESCE(:title, report_title),
+        clinical_indication = COALESCE(:indication, clinical_indication),
+        technique = COALESCE(:technique, technique),
+        findings = COALESCE(:findings, findings),
+        impression = COALESCE(:impression, impression),
+        recommendations = COALESCE(:recommendations, recommendations),
+        updated_at = NOW()
+    WHERE id = :report_id
+    RETURNING id
+""")
+
+_PUBLISH_REPORT_SQL = text("""
+    UPDATE reports 
+    SET report_status = 'published', published_at = NOW(), updated_at = NOW()
+    WHERE id = :report_id
+""")
+
+_REPORT_STATUS_SQL = text("""
+    SELECT id, report_status 
+    FROM reports 
+    WHERE id = :report_id
+""")
+
+_UNPUBLISH_REPORT_SQL = text("""
+    UPDATE reports 
+    SET report_status = 'draft', 
+        published_at = NULL, 
+        updated_at = NOW()
+    WHERE id = :report_id AND report_status = 'published'
+    RETURNING id
+""")
+
+_RECENT_OVERRIDES_SQL = text("""
+    SELECT COUNT(*) FROM radiologist_feedback
+    WHERE feedback_type IN ('partial_override', 'full_override')
+      AND feedback_timestamp >= NOW() - make_interval(hours => :hours)
+""")
+
+
+def _encode_cursor(*values) -> str:
+    """Opaque page cursor from the last row's sort key."""
+    return base64.urlsafe_b64encode(orjson.dumps(values)).decode()
+
+
+def _decode_cursor(cursor: str, keys: tuple) -> dict:
+    """Bind params for a cursor made by _encode_cursor (400 if malformed)."""
+    try:
+        values = orjson.loads(base64.urlsafe_b64decode(cursor.encode()))
+        params = dict(zip(keys, values, strict=True))
+        params["cursor_ts"] = datetime.fromisoformat(params["cursor_ts"])
+        params["cursor_id"] = UUID(params["cursor_id"])
+        if "cursor_rank" in params:
+            rank = params["cursor_rank"]
+            if isinstance(rank, bool) or not isinstance(rank, int):
+                raise TypeError("cursor_rank must be an integer")
+        return params
+    # base64/orjson/UUID/fromisoformat errors are ValueErrors; wrong JSON
+    # types raise TypeError or AttributeError
+    except (ValueError, TypeError, AttributeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+async def invalidate_worklist_cache() -> None:
+    """Drop the cached worklist pages; call after a scan or report status change."""
+    await cache_delete(_PENDING_CACHE_KEY, _COMPLETED_CACHE_KEY)
+
+
+def invalidate_worklist_cache_sync() -> None:
+    """invalidate_worklist_cache for the Celery worker (no event loop)."""
+    cache_delete_sync(_PENDING_CACHE_KEY, _COMPLETED_CACHE_KEY)
+
+
+def _worklist_row(r, sort_key: str) -> dict:
+    """Shape a worklist row for the response, dropping its sort-only column."""
+    row = dict(r)
+    del row[sort_key]
+    row["examination_type"] = EXAM_TYPE_DISPLAY.get(r["examination_type"], r["examination_type"])
+    row["body_region"] = r["body_region"].capitalize()
+    row["urgency_level"] = r["urgency_level"].capitalize()
+    return row
+
+
+def _pending_scan_row(r) -> dict:
+    """Shape a pending worklist row for the response."""
+    return _worklist_row(r, "urgency_rank")
 
 
 @router.get("/scans/pending")
 async def get_pending_scans(
+    size: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    format: str = Query("page", pattern="^(page|ndjson)$"),
     current_user: User = Depends(require_role(["radiologist"])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get all pending scans."""
+    """
+    Get pending scans (most urgent first), one keyset page at a time.
+    
+    format=ndjson streams every pending scan after the cursor instead,
+    one JSON object per line, ignoring size.
+    """
     try:
-        result = db.execute(text("""
-            SELECT 
-                s.id, s.scan_number, s.examination_type, s.body_region,
-                s.urgency_level, s.status, s.scan_date, s.created_at,
-                s.presenting_symptoms, s.current_medications, s.previous_surgeries,
-                pp.patient_id,
-                u.first_name || ' ' || u.last_name as patient_name
-            FROM scans s
-            JOIN patient_profiles pp ON s.patient_id = pp.id
-            JOIN users u ON pp.user_id = u.id
-            WHERE s.status IN ('pending', 'in_progress', 'ai_analyzed')
-            ORDER BY 
-                CASE s.urgency_level 
-                    WHEN 'emergent' THEN 1
-                    WHEN 'urgent' THEN 2
-                    ELSE 3
-                END,
-                s.created_at DESC
-        """))
-        
-        scans = []
-        for row in result:
-            scans.append({
-                "id": str(row.id),
-                "scan_number": row.scan_number,
-                "patient_name": row.patient_name,
-                "patient_id": row.patient_id,
-                "examination_type": capitalize_for_display(row.examination_type, 'examination_type'),
-                "body_region": capitalize_for_display(row.body_region, 'body_region'),
-                "urgency_level": capitalize_for_display(row.urgency_level, 'urgency_level'),
-                "status": row.status,
-                "scan_date": row.scan_date.isoformat(),
-                "created_at": row.created_at.isoformat(),
-                "presenting_symptoms": row.presenting_symptoms or [],
-                "current_medications": row.current_medications or [],
-                "previous_surgeries": row.previous_surgeries or []
-            })
+        if format == "ndjson":
+            statement, params = _PENDING_SCANS_STREAM_STMT, {}
+            if cursor:
+                statement = statement.where(_PENDING_AFTER_CURSOR)
+                params.update(_decode_cursor(cursor, ("cursor_rank", "cursor_ts", "cursor_id")))
+            return await stream_rows(
+                statement, params, _pending_scan_row, format, "pending scans"
+            )
+        
+        if not cursor:
+            cached = await cache_hget_raw(_PENDING_CACHE_KEY, str(size))
+            if cached is not None:
+                return Response(cached, media_type="application/json", headers={"X-Cache": "HIT"})
+        
+        statement, params = _PENDING_SCANS_STMT, {"size": size + 1}
+        if cursor:
+            statement = statement.where(_PENDING_AFTER_CURSOR)
+            params.update(_decode_cursor(cursor, ("cursor_rank", "cursor_ts", "cursor_id")))
+        
+        result = await db.execute(statement, params)
+        
+        # One extra row tells us whether another page exists
+        rows = result.mappings().all()
+        next_cursor = None
+        if len(rows) > size:
+            rows = rows[:size]
+            last = rows[-1]
+            next_cursor = _encode_cursor(last["urgency_rank"], last["created_at"], last["id"])
+        
+        scans = [_pending_scan_row(r) for r in rows]
         
         logger.info(f"Retrieved {len(scans)} pending scans")
-        return scans
+        # Serialized here rather than returned as a dict so FastAPI skips its
+        # jsonable_encoder pass over every row, and the bytes can be cached
+        body = orjson.dumps({"items": scans, "next_cursor": next_cursor, "size": size})
+        if cursor:
+            return Response(body, media_type="application/json")
+        await cache_hset_raw(_PENDING_CACHE_KEY, str(size), body, settings.WORKLIST_CACHE_TTL_SECONDS)
+        return Response(body, media_type="application/json", headers={"X-Cache": "MISS"})
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to get pending scans: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _completed_scan_row(r) -> dict:
+    """Shape a completed worklist row for the response."""
+    return _worklist_row(r, "completed_sort")
+
+
 @router.get("/scans/completed")
 async def get_completed_scans(
+    size: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    format: str = Query("page", pattern="^(page|ndjson)$"),
     current_user: User = Depends(require_role(["radiologist"])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get completed scans with report status."""
+    """
+    Get completed scans with report status, one keyset page at a time.
+    
+    format=ndjson streams every completed scan after the cursor instead,
+    one JSON object per line, ignoring size.
+    """
     try:
-        result = db.execute(text("""
-            SELECT 
-                s.id, s.scan_number, s.examination_type, s.body_region,
-                s.urgency_level, s.status, s.scan_date, s.created_at,
-                s.presenting_symptoms, s.current_medications, s.previous_surgeries,
-                pp.patient_id,
-                u.first_name || ' ' || u.last_name as patient_name,
-                r.report_status
-            FROM scans s
-            JOIN patient_profiles pp ON s.patient_id = pp.id
-            JOIN users u ON pp.user_id = u.id
-            LEFT JOIN reports r ON s.id = r.scan_id
-            WHERE s.status = 'completed'
-            ORDER BY s.radiologist_review_completed_at DESC
-        """))
-        
-        scans = []
-        for row in result:
-            scans.append({
-                "id": str(row.id),
-                "scan_number": row.scan_number,
-                "patient_name": row.patient_name,
-                "patient_id": row.patient_id,
-                "examination_type": capitalize_for_display(row.examination_type, 'examination_type'),
-                "body_region": capitalize_for_display(row.body_region, 'body_region'),
-                "urgency_level": capitalize_for_display(row.urgency_level, 'urgency_level'),
-                "status": row.status,
-                "scan_date": row.scan_date.isoformat(),
-                "created_at": row.created_at.isoformat(),
-                "presenting_symptoms": row.presenting_symptoms or [],
-                "current_medications": row.current_medications or [],
-                "previous_surgeries": row.previous_surgeries or [],
-                "report_status": row.report_status or "draft"
-            })
-        
-        return scans
+        if format == "ndjson":
+            statement, params = _COMPLETED_SCANS_STREAM_STMT, {}
+            if cursor:
+                statement = statement.where(_COMPLETED_AFTER_CURSOR)
+                params.update(_decode_cursor(cursor, ("cursor_ts", "cursor_id")))
+            return await stream_rows(
+                statement, params, _completed_scan_row, format, "completed scans"
+            )
+        
+        if not cursor:
+            cached = await cache_hget_raw(_COMPLETED_CACHE_KEY, str(size))
+            if cached is not None:
+                return Response(cached, media_type="application/json", headers={"X-Cache": "HIT"})
+        
+        statement, params = _COMPLETED_SCANS_STMT, {"size": size + 1}
+        if cursor:
+            statement = statement.where(_COMPLETED_AFTER_CURSOR)
+            params.update(_decode_cursor(cursor, ("cursor_ts", "cursor_id")))
+        
+        result = await db.execute(statement, params)
+        
+        rows = result.mappings().all()
+        next_cursor = None
+        if len(rows) > size:
+            rows = rows[:size]
+            last = rows[-1]
+            next_cursor = _encode_cursor(last["completed_sort"], last["id"])
+        
+        scans = [_completed_scan_row(r) for r in rows]
         
+        body = orjson.dumps({"items": scans, "next_cursor": next_cursor, "size": size})
+        if cursor:
+            return Response(body, media_type="application/json")
+        await cache_hset_raw(_COMPLETED_CACHE_KEY, str(size), body, settings.WORKLIST_CACHE_TTL_SECONDS)
+        return Response(body, media_type="application/json", headers={"X-Cache": "MISS"})
+        
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to get completed scans: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _scan_detail_payload(row, image_rows, signed_urls):
+    """Build the scan detail response from a _SCAN_DETAIL_SELECT row."""
+    images = []
+    for img, signed_url in zip(image_rows, signed_urls):
+        images.append({
+            "url": signed_url,
+            "gcs_path": img["image_path"],
+            "size": img["file_size_bytes"],
+            "format": img["image_format"],
+            "order": img["image_order"]
+        })
+    
+    return {
+        "id": row.id,
+        "scan_number": row.scan_number,
+        "patient_name": row.patient_name,
+        "patient_id": row.patient_id,
+        "age_years": row.age_years,
+        "examination_type": capitalize_for_display(row.examination_type, 'examination_type'),
+        "body_region": capitalize_for_display(row.body_region, 'body_region'),
+        "urgency_level": capitalize_for_display(row.urgency_level, 'urgency_level'),
+        "status": row.status,
+        "scan_date": row.scan_date,
+        "presenting_symptoms": row.presenting_symptoms,
+        "current_medications": row.current_medications,
+        "previous_surgeries": row.previous_surgeries,
+        "clinical_notes": row.clinical_notes,
+        "images": images
+    }
+
+
+@router.get("/scans/batch")
+async def get_scans_batch(
+    background_tasks: BackgroundTasks,
+    ids: str = Query(..., description="Comma-separated scan ids"),
+    current_user: User = Depends(require_role(["radiologist"])),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get details for several scans in one query, keyed by scan id."""
+    try:
+        try:
+            scan_ids = list(dict.fromkeys(UUID(i.strip()) for i in ids.split(',') if i.strip()))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid scan id")
+        
+        if not scan_ids:
+            raise HTTPException(status_code=400, detail="No scan ids given")
+        if len(scan_ids) > _MAX_BATCH_SCANS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"At most {_MAX_BATCH_SCANS} scans per request"
+            )
+        
+        rows = (await db.execute(_SCANS_BATCH_SQL, {"ids": scan_ids})).fetchall()
+        
+        # Sign every scan's images concurrently
+        image_rows = [load_json_images(row.images) for row in rows]
+        resolved = await asyncio.gather(
+            *(gcs_storage.resolve_image_urls(imgs) for imgs in image_rows)
+        )
+        
+        stale_paths = [path for _, stale in resolved for path in stale]
+        if stale_paths:
+            background_tasks.add_task(refresh_presigned_urls, stale_paths)
+        
+        return ORJSONResponse({
+            str(row.id): _scan_detail_payload(row, imgs, signed_urls)
+            for row, imgs, (signed_urls, _) in zip(rows, image_rows, resolved)
+        })
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to get scans batch: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/scans/{scan_id}")
 async def get_scan_details(
     scan_id: UUID,
+    request: Request,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(require_role(["radiologist"])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get detailed scan info with signed image URLs."""
+    """Get detailed scan info with signed image URLs (revalidates via ETag)."""
     try:
-        from app.services.gcs_storage import gcs_storage
-        
-        result = db.execute(text("""
-            SELECT 
-                s.*, pp.patient_id, pp.age_years, pp.weight_kg, pp.height_cm,
-                pp.gender, pp.blood_type, pp.allergies,
-                u.first_name || ' ' || u.last_name as patient_name
-            FROM scans s
-            JOIN patient_profiles pp ON s.patient_id = pp.id
-            JOIN users u ON pp.user_id = u.id
-            WHERE s.id = :scan_id
-        """), {"scan_id": str(scan_id)})
+        result = await db.execute(_SCAN_DETAIL_SQL, {"scan_id": scan_id})
         
         row = result.fetchone()
         if not row:
             raise HTTPException(status_code=404, detail="Scan not found")
         
-        # Get images and convert to signed URLs
-        images_result = db.execute(text("""
-            SELECT image_path, file_size_bytes, image_format, image_order
-            FROM scan_images
-            WHERE scan_id = :scan_id
-            ORDER BY image_order
-        """), {"scan_id": str(scan_id)})
-        
-        images = []
-        for img in images_result:
-            signed_url = gcs_storage.get_signed_url(img.image_path, expiration=3600)
-            
-            images.append({
-                "url": signed_url,
-                "gcs_path": img.image_path,
-                "size": img.file_size_bytes,
-                "format": img.image_format,
-                "order": img.image_order
-            })
+        # Images come back aggregated on the scan row; convert to signed URLs
+        image_rows = load_json_images(row.images)
+        signed_urls, stale_paths = await gcs_storage.resolve_image_urls(image_rows)
+        if stale_paths:
+            background_tasks.add_task(refresh_presigned_urls, stale_paths)
+        
+        # Only cacheable when every URL is a stored pre-signed one; freshly
+        # signed URLs differ per request and may outlive a revalidated copy.
+        headers = {}
+        if not stale_paths:
+            etag = detail_etag(
+                row.id, row.updated_at,
+                *(int(img["signed_url_expires_at"].timestamp()) for img in image_rows)
+            )
+            headers, cached = not_modified(request, etag)
+            if cached:
+                return cached
         
-        return {
-            "id": str(row.id),
-            "scan_number": row.scan_number,
-            "patient_name": row.patient_name,
-            "patient_id": row.patient_id,
-            "age_years": row.age_years,
-            "examination_type": capitalize_for_display(row.examination_type, 'examination_type'),
-            "body_region": capitalize_for_display(row.body_region, 'body_region'),
-            "urgency_level": capitalize_for_display(row.urgency_level, 'urgency_level'),
-            "status": row.status,
-            "scan_date": row.scan_date.isoformat(),
-            "presenting_symptoms": row.presenting_symptoms or [],
-            "current_medications": row.current_medications or [],
-            "previous_surgeries": row.previous_surgeries or [],
-            "clinical_notes": row.clinical_notes,
-            "images": images
-        }
+        return ORJSONResponse(_scan_detail_payload(row, image_rows, signed_urls), headers=headers)
         
     except HTTPException:
         raise
@@ -259,11 +749,15 @@ async def start_ai_analysis(
     scan_id: UUID,
     background_tasks: BackgroundTasks,
     current_user: User = Depends(require_role(["radiologist"])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Start AI analysis."""
     try:
-        scan = db.query(Scan).filter(Scan.id == scan_id).first()
+        result = await db.execute(
+            select(Scan.examination_type, Scan.body_region, Scan.scan_number)
+            .where(Scan.id == scan_id)
+        )
+        scan = result.one_or_none()
         if not scan:
             raise HTTPException(status_code=404, detail="Scan not found")
         
@@ -275,21 +769,26 @@ async def start_ai_analysis(
                 detail=f"No model for {scan.examination_type} {scan.body_region}"
             )
         
-        scan.status = 'in_progress'
-        scan.ai_analysis_started_at = datetime.utcnow()
-        db.commit()
+        await db.execute(_START_ANALYSIS_SQL, {"scan_id": scan_id})
+        await db.commit()
+        await invalidate_worklist_cache()
         
-        background_tasks.add_task(
-            run_ai_analysis_workflow,
-            scan_id=str(scan_id),
-            model_type=model_info['type']
-        )
+        if celery_app is not None:
+            # Queue for the analysis workers (scale independently of the API)
+            await asyncio.to_thread(
+                celery_app.send_task,
+                "run_ai_analysis_workflow",
+                args=[str(scan_id), model_info['type']]
+            )
+        else:
+            # Runs on this event loop after the response is sent
+            background_tasks.add_task(run_ai_analysis, scan_id, model_info['type'])
         
         logger.info(f" Starting {model_info['name']} for {scan.scan_number}")
         
         return {
             "message": "AI analysis started",
-            "scan_id": str(scan_id),
+            "scan_id": scan_id,
             "model": model_info['name'],
             "status": "processing"
         }
@@ -304,22 +803,13 @@ async def start_ai_analysis(
 @router.get("/scans/{scan_id}/ai-results")
 async def get_ai_results(
     scan_id: UUID,
+    request: Request,
     current_user: User = Depends(require_role(["radiologist"])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get AI prediction results."""
+    """Get AI prediction results (revalidates via ETag)."""
     try:
-        from app.services.gcs_storage import gcs_storage
-        
-        result = db.execute(text("""
-            SELECT 
-                id, predicted_class, confidence_score, class_probabilities,
-                inference_timestamp, model_name
-            FROM ai_predictions
-            WHERE scan_id = :scan_id
-            ORDER BY inference_timestamp DESC
-            LIMIT 1
-        """), {"scan_id": str(scan_id)})
+        result = await db.execute(_LATEST_PREDICTION_SQL, {"scan_id": scan_id})
         
         prediction = result.fetchone()
         
@@ -327,54 +817,52 @@ async def get_ai_results(
             raise HTTPException(status_code=404, detail="No AI results available yet")
         
         # Get GradCAM
-        gradcam_result = db.execute(text("""
-            SELECT overlay_url, overlay_path, heatmap_url, heatmap_path
-            FROM gradcam_outputs
-            WHERE ai_prediction_id = :ai_pred_id
-            ORDER BY created_at DESC
-            LIMIT 1
-        """), {"ai_pred_id": str(prediction.id)})
+        gradcam_result = await db.execute(_LATEST_GRADCAM_SQL, {"ai_pred_id": prediction.id})
         
         gradcam = gradcam_result.fetchone()
-        gradcam_url = None
+        gradcam_path = None
         
         if gradcam:
-            gcs_path = gradcam.overlay_path or gradcam.overlay_url or gradcam.heatmap_path or gradcam.heatmap_url
-            if gcs_path:
-                gradcam_url = gcs_storage.get_signed_url(gcs_path, expiration=3600)
+            gradcam_path = gradcam.overlay_path or gradcam.overlay_url or gradcam.heatmap_path or gradcam.heatmap_url
         
         # Get original image
-        image_result = db.execute(text("""
-            SELECT image_path
-            FROM scan_images
-            WHERE scan_id = :scan_id
-            ORDER BY image_order
-            LIMIT 1
-        """), {"scan_id": str(scan_id)})
+        image_result = await db.execute(_FIRST_IMAGE_SQL, {"scan_id": scan_id})
         
         image = image_result.fetchone()
-        original_image_url = None
-        
-        if image:
-            original_image_url = gcs_storage.get_signed_url(image.image_path, expiration=3600)
+        image_path = image.image_path if image else None
+        
+        # Tag from the rows only, so every worker agrees and a 304 skips
+        # signing. The window rotates it before a client's copy of the
+        # signed URLs (valid at least that long when served) can expire.
+        headers, cached = not_modified(
+            request,
+            detail_etag(
+                prediction.id,
+                prediction.inference_timestamp,
+                gradcam.id if gradcam else "none",
+                hashlib.blake2b((image_path or "").encode(), digest_size=8).hexdigest(),
+                int(time.time()) // PRESIGNED_URL_REFRESH_MARGIN,
+            ),
+        )
+        if cached:
+            return cached
         
-        # Parse class_probabilities
-        import json
-        try:
-            probs = json.loads(prediction.class_probabilities) if isinstance(prediction.class_probabilities, str) else prediction.class_probabilities
-        except:
-            probs = {}
+        # Sign both URLs in one concurrent batch
+        to_sign = [path for path in (gradcam_path, image_path) if path]
+        signed = dict(zip(to_sign, await gcs_storage.get_signed_urls(to_sign, expiration=3600)))
+        gradcam_url = signed.get(gradcam_path)
+        original_image_url = signed.get(image_path)
         
-        return {
-            "prediction_id": str(prediction.id),
+        return ORJSONResponse({
+            "prediction_id": prediction.id,
             "predicted_class": prediction.predicted_class,
             "confidence_score": float(prediction.confidence_score),
-            "class_probabilities": probs,
+            "class_probabilities": prediction.class_probabilities or {},
             "model_name": prediction.model_name,
-            "inference_timestamp": prediction.inference_timestamp.isoformat(),
+            "inference_timestamp": prediction.inference_timestamp,
             "gradcam_url": gradcam_url,
             "original_image_url": original_image_url
-        }
+        }, headers=headers)
         
     except HTTPException:
         raise
@@ -383,124 +871,73 @@ async def get_ai_results(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _existing_report_payload(row, current_user: User) -> dict:
+    """Draft-report response for a report already stored for the scan."""
+    return {
+        "id": row.report_id,
+        "report_number": row.report_number,
+        "report_title": row.report_title,
+        "clinical_indication": row.clinical_indication,
+        "technique": row.technique,
+        "findings": row.findings,
+        "impression": row.impression,
+        "recommendations": row.recommendations,
+        "report_status": row.report_status,
+        "scan_number": row.scan_number,
+        "patient_name": row.patient_name,
+        "radiologist_name": row.radiologist_name or f"Dr. {current_user.first_name} {current_user.last_name}",
+        "license_number": row.license_number,
+        "specialization": row.specialization,
+        "created_at": row.created_at,
+        "published_at": row.published_at
+    }
+
+
 @router.get("/scans/{scan_id}/draft-report")
 async def get_draft_report(
     scan_id: UUID,
     current_user: User = Depends(require_role(["radiologist"])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get draft report with radiologist information."""
     try:
-        # Check if report exists
-        result = db.execute(text("""
-            SELECT 
-                r.id, r.report_number, r.report_title, r.clinical_indication,
-                r.technique, r.findings, r.impression, r.recommendations,
-                r.report_status, r.created_at, r.published_at,
-                s.scan_number,
-                u.first_name || ' ' || u.last_name as patient_name,
-                rad_u.first_name || ' ' || rad_u.last_name as radiologist_name,
-                rad_p.license_number, rad_p.specialization
-            FROM reports r
-            JOIN scans s ON r.scan_id = s.id
-            JOIN patient_profiles pp ON s.patient_id = pp.id
-            JOIN users u ON pp.user_id = u.id
-            LEFT JOIN radiologist_profiles rad_p ON rad_p.user_id = :radiologist_id
-            LEFT JOIN users rad_u ON rad_p.user_id = rad_u.id
-            WHERE r.scan_id = :scan_id
-            ORDER BY r.created_at DESC
-            LIMIT 1
-        """), {
-            "scan_id": str(scan_id),
-            "radiologist_id": str(current_user.id)
+        result = await db.execute(_DRAFT_REPORT_SQL, {
+            "scan_id": scan_id,
+            "radiologist_id": current_user.id
         })
         
-        report = result.fetchone()
-        
-        if report:
-            return {
-                "id": str(report.id),
-                "report_number": report.report_number,
-                "report_title": report.report_title,
-                "clinical_indication": report.clinical_indication,
-                "technique": report.technique,
-                "findings": report.findings,
-                "impression": report.impression,
-                "recommendations": report.recommendations,
-                "report_status": report.report_status,
-                "scan_number": report.scan_number,
-                "patient_name": report.patient_name,
-                "radiologist_name": report.radiologist_name or f"Dr. {current_user.first_name} {current_user.last_name}",
-                "license_number": report.license_number,
-                "specialization": report.specialization,
-                "created_at": report.created_at.isoformat(),
-                "published_at": report.published_at.isoformat() if report.published_at else None
-            }
-        
-        # Create template report if none exists
-        scan = db.query(Scan).filter(Scan.id == scan_id).first()
-        if not scan:
+        row = result.fetchone()
+        if not row:
             raise HTTPException(status_code=404, detail="Scan not found")
         
-        # Get AI prediction
-        ai_result = db.execute(text("""
-            SELECT predicted_class, confidence_score
-            FROM ai_predictions
-            WHERE scan_id = :scan_id
-            ORDER BY inference_timestamp DESC
-            LIMIT 1
-        """), {"scan_id": str(scan_id)})
-        
-        ai_prediction = ai_result.fetchone()
-        
-        # Get patient info
-        patient_result = db.execute(text("""
-            SELECT u.first_name || ' ' || u.last_name as patient_name, s.scan_number
-            FROM scans s
-            JOIN patient_profiles pp ON s.patient_id = pp.id
-            JOIN users u ON pp.user_id = u.id
-            WHERE s.id = :scan_id
-        """), {"scan_id": str(scan_id)})
-        
-        patient = patient_result.fetchone()
+        # Return the existing report if there is one
+        if row.report_id is not None:
+            return _existing_report_payload(row, current_user)
         
+        # Create template report if none exists
         # Get radiologist info
         radiologist_name = f"Dr. {current_user.first_name} {current_user.last_name}"
         
-        if ai_prediction:
-            predicted_class = ai_prediction.predicted_class
-            confidence = float(ai_prediction.confidence_score)
+        if row.predicted_class is not None:
+            predicted_class = row.predicted_class
+            confidence = float(row.confidence_score)
         else:
             predicted_class = "Unknown"
             confidence = 0.0
         
         # Generate comprehensive report using helper function
         report_template = generate_report_template(
-            scan, 
+            row, 
             predicted_class, 
             confidence, 
             radiologist_name
         )
         
-        report_id = str(uuid_lib.uuid4())
-        report_number = f"RPT-{scan.scan_number}"
-        
-        # Insert report
-        db.execute(text("""
-            INSERT INTO reports (
-                id, scan_id, report_number, report_type, report_status,
-                report_title, clinical_indication, technique,
-                findings, impression, recommendations,
-                created_at, updated_at
-            ) VALUES (
-                :id, :scan_id, :report_number, 'preliminary_ai', 'draft',
-                :title, :indication, :technique,
-                :findings, :impression, :recommendations,
-                NOW(), NOW()
-            )
-        """), {
-            'id': report_id,
-            'scan_id': str(scan_id),
+        report_number = f"RPT-{row.scan_number}"
+        
+        # Insert report; the stored key columns come back from the same statement
+        created = (await db.execute(_INSERT_DRAFT_REPORT_SQL, {
+            'scan_id': scan_id,
             'report_number': report_number,
             'title': report_template['title'],
             'indication': report_template['indication'],
@@ -508,23 +945,45 @@ async def get_draft_report(
             'findings': report_template['findings'],
             'impression': report_template['impression'],
             'recommendations': report_template['recommendations']
-        })
+        })).first()
+        
+        if created is None:
+            # A concurrent request created the draft first; return that one
+            await db.rollback()
+            row = (await db.execute(_DRAFT_REPORT_SQL, {
+                "scan_id": scan_id,
+                "radiologist_id": current_user.id
+            })).fetchone()
+            if not row:
+                raise HTTPException(status_code=404, detail="Scan not found")
+            if row.report_id is None:
+                # The report number is taken by a report on another scan
+                raise HTTPException(
+                    status_code=409,
+                    detail=f"Report number {report_number} is already in use"
+                )
+            return _existing_report_payload(row, current_user)
         
-        db.commit()
+        await db.commit()
+        await invalidate_worklist_cache()
         
         return {
-            "id": report_id,
-            "report_number": report_number,
+            "id": created.id,
+            "report_number": created.report_number,
             "report_title": report_template['title'],
             "clinical_indication": report_template['indication'],
             "technique": report_template['technique'],
             "findings": report_template['findings'],
             "impression": report_template['impression'],
             "recommendations": report_template['recommendations'],
-            "report_status": "draft",
-            "scan_number": patient.scan_number,
-            "patient_name": patient.patient_name,
-            "radiologist_name": radiologist_name
+            "report_status": created.report_status,
+            "scan_number": row.scan_number,
+            "patient_name": row.patient_name,
+            "radiologist_name": radiologist_name,
+            "license_number": row.license_number,
+            "specialization": row.specialization,
+            "created_at": created.created_at,
+            "published_at": created.published_at
         }
         
     except HTTPException:
@@ -536,136 +995,144 @@ async def get_draft_report(
 
 def determine_model(exam_type, body_region):
     """Determine model."""
+    exam_val = getattr(exam_type, 'value', exam_type)
+    body_val = getattr(body_region, 'value', body_region)
+    return _MODEL_MAP.get((exam_val, body_val))
+
+
+# Model type (the 'type' of a _MODEL_MAP entry) -> predictor and stored model name
+_PREDICTORS = MappingProxyType({
+    'tb': ml_model_service.predict_tb,
+    'lung_cancer': ml_model_service.predict_lung_cancer,
+})
+_MODEL_LABELS = MappingProxyType({t: f'{t.upper()}-ResNet50' for t in _PREDICTORS})
+
+
+def _run_inference(scan, scan_id, model_type: str) -> dict:
+    """
+    Download the scan image, run the ML model and upload its GradCAM.
     
-    if hasattr(exam_type, 'value'):
-        exam_val = exam_type.value
-    else:
-        exam_val = str(exam_type)
+    Blocking (GCS + remote model); returns the _SAVE_ANALYSIS_SQL params.
+    """
+    predict = _PREDICTORS.get(model_type)
+    if predict is None:
+        raise Exception(f"Unknown model: {model_type}")
+    model_label = _MODEL_LABELS[model_type]
     
-    if hasattr(body_region, 'value'):
-        body_val = body_region.value  
-    else:
-        body_val = str(body_region)
+    logger.info(f"Downloading image from GCS...")
+    image_data = gcs_storage.download_image(scan.image_path)
     
-    if exam_val == 'xray' and body_val == 'chest':
-        return {'type': 'tb', 'name': 'TB Detection Model'}
-    elif exam_val == 'ct' and body_val == 'chest':
-        return {'type': 'lung_cancer', 'name': 'Lung Cancer Model'}
+    # Call ML model
+    prediction, gradcam_image = predict(image_data)
     
-    return None
+    # Upload GradCAM first so every write after this goes out in one statement
+    gradcam_url = None
+    if gradcam_image:
+        logger.info("Uploading GradCAM...")
+        gradcam_url = gcs_storage.upload_scan_image(
+            file_data=gradcam_image,
+            patient_id=scan.patient_code,
+            scan_id=scan_id,
+            filename="gradcam_overlay.jpg",
+            # Prediction travels with the overlay for anyone reading the bucket
+            metadata={
+                'predicted_class': prediction['predicted_class'],
+                'confidence': str(prediction['confidence']),
+                'model': model_label
+            }
+        )
+    
+    return {
+        'scan_id': scan_id,
+        'model': model_label,
+        'version': 'v1.0',
+        'class': prediction['predicted_class'],
+        'confidence': prediction['confidence'],
+        'probs': orjson.dumps(prediction['class_probabilities']).decode(),
+        'scan_img_id': scan.image_id,
+        'gradcam_url': gradcam_url
+    }
+
+
+async def run_ai_analysis(scan_id: UUID, model_type: str):
+    """Background task: Run ML model in-process (no Celery broker)."""
+    async with AsyncSessionLocal() as db:
+        try:
+            # Scan number, patient code and first image in one targeted query
+            scan = (await db.execute(_ANALYSIS_INPUTS_SQL, {"scan_id": scan_id})).first()
+            # Hand the connection back to the pool for the duration of inference
+            await db.commit()
+            if not scan:
+                return
+            
+            if not scan.image_path:
+                logger.error(f"No image for {scan_id}")
+                await db.execute(_RESET_ANALYSIS_SQL, {"scan_id": scan_id})
+                await db.commit()
+                await invalidate_worklist_cache()
+                return
+            
+            # Dedicated pool so slow GCS/model calls don't tie up the request threadpool
+            params = await asyncio.get_running_loop().run_in_executor(
+                _ML_POOL, _run_inference, scan, scan_id, model_type
+            )
+            
+            # Save prediction (label normalized via diagnosis_synonyms), its
+            # GradCAM row and the scan status in a single round trip
+            normalized_class = (await db.execute(_SAVE_ANALYSIS_SQL, params)).scalar()
+            await db.commit()
+            await invalidate_worklist_cache()
+            
+            logger.info(f" Complete: {scan.scan_number} → {normalized_class}")
+            
+        except Exception as e:
+            logger.error(f"Analysis failed: {e}", exc_info=True)
+            await db.rollback()
+            try:
+                await db.execute(_RESET_ANALYSIS_SQL, {"scan_id": scan_id})
+                await db.commit()
+            except SQLAlchemyError as reset_error:
+                # Database unreachable: the scan stays in_progress until retried
+                logger.error(f"Could not reset scan {scan_id}: {reset_error}")
+                await db.rollback()
+                return
+            await invalidate_worklist_cache()
 
 
 def run_ai_analysis_workflow(scan_id: str, model_type: str):
-    """Background task: Run ML model."""
-    from app.core.database import SessionLocal
-    from app.services.gcs_storage import gcs_storage
-    from app.services.ml_model_service import ml_model_service
-    
+    """Celery task body: run_ai_analysis on a sync session (no event loop in the worker)."""
     db = SessionLocal()
     
     try:
-        scan = db.query(Scan).filter(Scan.id == scan_id).first()
+        scan = db.execute(_ANALYSIS_INPUTS_SQL, {"scan_id": scan_id}).first()
+        db.commit()
         if not scan:
             return
         
-        scan_image = db.query(ScanImage).filter(
-            ScanImage.scan_id == scan_id,
-            ScanImage.image_order == 1
-        ).first()
-        
-        if not scan_image:
+        if not scan.image_path:
             logger.error(f"No image for {scan_id}")
-            scan.status = 'pending'
+            db.execute(_RESET_ANALYSIS_SQL, {"scan_id": scan_id})
             db.commit()
+            invalidate_worklist_cache_sync()
             return
         
-        logger.info(f"Downloading image from GCS...")
-        image_data = gcs_storage.download_image(scan_image.image_path)
-        
-        # Call ML model
-        if model_type == 'tb':
-            prediction, gradcam_image = ml_model_service.predict_tb(image_data)
-        elif model_type == 'lung_cancer':
-            prediction, gradcam_image = ml_model_service.predict_lung_cancer(image_data)
-        else:
-            raise Exception(f"Unknown model: {model_type}")
-        
-        # Normalize predicted_class
-        normalized_class = normalize_diagnosis(prediction['predicted_class'])
-        
-        # Save prediction
-        from psycopg2.extras import Json
-        ai_prediction_id = str(uuid_lib.uuid4())
-        db.execute(text("""
-            INSERT INTO ai_predictions (
-                id, scan_id, model_name, model_version,
-                predicted_class, confidence_score, class_probabilities,
-                inference_timestamp
-            ) VALUES (
-                :id, :scan_id, :model, :version,
-                :class, :confidence, :probs, NOW()
-            )
-        """), {
-            'id': ai_prediction_id,
-            'scan_id': scan_id,
-            'model': f'{model_type.upper()}-ResNet50',
-            'version': 'v1.0',
-            'class': normalized_class,
-            'confidence': prediction['confidence'],
-            'probs': Json(prediction['class_probabilities'])
-        })
-        
-        # Upload GradCAM
-        if gradcam_image:
-            patient = db.query(PatientProfile).filter(
-                PatientProfile.id == scan.patient_id
-            ).first()
-            
-            logger.info("Uploading GradCAM...")
-            gradcam_url = gcs_storage.upload_scan_image(
-                file_data=gradcam_image,
-                patient_id=patient.patient_id,
-                scan_id=scan_id,
-                filename="gradcam_overlay.jpg"
-            )
-            
-            db.execute(text("""
-                INSERT INTO gradcam_outputs (
-                    ai_prediction_id, 
-                    scan_image_id,
-                    heatmap_path,
-                    heatmap_url,
-                    overlay_path,
-                    overlay_url,
-                    target_class
-                ) VALUES (
-                    :ai_pred_id, 
-                    :scan_img_id,
-                    :path,
-                    :url,
-                    :path,
-                    :url,
-                    :target_class
-                )
-            """), {
-                'ai_pred_id': ai_prediction_id,
-                'scan_img_id': str(scan_image.id),
-                'path': gradcam_url,
-                'url': gradcam_url,
-                'target_class': normalized_class
-            })
-        
-        # Update scan
-        scan.status = 'ai_analyzed'
-        scan.ai_analysis_completed_at = datetime.utcnow()
+        params = _run_inference(scan, scan_id, model_type)
+        normalized_class = db.execute(_SAVE_ANALYSIS_SQL, params).scalar()
         db.commit()
+        invalidate_worklist_cache_sync()
         
         logger.info(f" Complete: {scan.scan_number} → {normalized_class}")
         
     except Exception as e:
         logger.error(f"Analysis failed: {e}", exc_info=True)
-        scan.status = 'pending'
-        db.commit()
+        db.rollback()
+        try:
+            db.execute(_RESET_ANALYSIS_SQL, {"scan_id": scan_id})
+            db.commit()
+            invalidate_worklist_cache_sync()
+        except SQLAlchemyError as reset_error:
+            logger.error(f"Could not reset scan {scan_id}: {reset_error}")
+            db.rollback()
     finally:
         db.close()
 
@@ -677,19 +1144,19 @@ async def submit_feedback(
     feedback: FeedbackCreate,
     background_tasks: BackgroundTasks,
     current_user: User = Depends(require_role(["radiologist"])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Submit diagnosis."""
     try:
-        scan = db.query(Scan).filter(Scan.id == scan_id).first()
-        if not scan:
+        # Scan and radiologist keys in one round trip
+        result = await db.execute(
+            _FEEDBACK_KEYS_SQL,
+            {"scan_id": scan_id, "user_id": current_user.id}
+        )
+        keys = result.first()
+        if not keys:
             raise HTTPException(status_code=404, detail="Scan not found")
-        
-        radiologist = db.query(RadiologistProfile).filter(
-            RadiologistProfile.user_id == current_user.id
-        ).first()
-        
-        if not radiologist:
+        if not keys.rad_id:
             raise HTTPException(status_code=404, detail="Radiologist profile not found")
         
         # Normalize diagnosis
@@ -697,7 +1164,7 @@ async def submit_feedback(
         
         feedback_record = RadiologistFeedback(
             scan_id=scan_id,
-            radiologist_id=radiologist.id,
+            radiologist_id=keys.rad_id,
             feedback_type=feedback.feedback_type,
             ai_diagnosis=getattr(feedback, 'ai_diagnosis', None),
             radiologist_diagnosis=normalized_diagnosis,
@@ -709,27 +1176,33 @@ async def submit_feedback(
         )
         
         db.add(feedback_record)
-        scan.status = 'completed'
-        scan.radiologist_review_completed_at = datetime.utcnow()
-        db.commit()
-        db.refresh(feedback_record)
+        await db.execute(_COMPLETE_SCAN_SQL, {"scan_id": scan_id})
+        await db.commit()
+        await invalidate_worklist_cache()
+        await db.refresh(feedback_record)
         
-        logger.info(f" Diagnosis: {scan.scan_number} → {normalized_diagnosis}")
+        logger.info(f" Diagnosis: {keys.scan_number} → {normalized_diagnosis}")
         
         # Sync to MLOps
-        try:
-            from app.services.mlops_sync import sync_scan_to_mlops
-            background_tasks.add_task(
-                sync_scan_to_mlops,
-                scan_id=str(scan_id),
-                diagnosis=str(feedback.radiologist_diagnosis),
-                db=db
+        if celery_app is not None:
+            await asyncio.to_thread(
+                celery_app.send_task,
+                "sync_scan_to_mlops",
+                args=[str(scan_id), str(feedback.radiologist_diagnosis)]
             )
-        except ImportError:
-            logger.warning("MLOps sync not available")
+        else:
+            try:
+                from app.services.mlops_sync import sync_scan_to_mlops
+                background_tasks.add_task(
+                    sync_scan_to_mlops,
+                    scan_id=str(scan_id),
+                    diagnosis=str(feedback.radiologist_diagnosis)
+                )
+            except ImportError:
+                logger.warning("MLOps sync not available")
 
         if feedback.feedback_type in ['partial_override', 'full_override']:
-            check_and_alert_disagreement_threshold(db)
+            await check_and_alert_disagreement_threshold(db, background_tasks)
         
         return FeedbackResponse(
             id=feedback_record.id,
@@ -743,7 +1216,7 @@ async def submit_feedback(
         raise
     except Exception as e:
         logger.error(f"Feedback failed: {e}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -752,53 +1225,35 @@ async def update_report(
     report_id: UUID,
     report_data: ReportUpdate,
     current_user: User = Depends(require_role(["radiologist"])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update report."""
     try:
-        updates = []
-        params = {'report_id': str(report_id)}
-        
-        if report_data.report_title is not None:
-            updates.append("report_title = :title")
-            params['title'] = report_data.report_title
-        
-        if report_data.clinical_indication is not None:
-            updates.append("clinical_indication = :indication")
-            params['indication'] = report_data.clinical_indication
-        
-        if report_data.technique is not None:
-            updates.append("technique = :technique")
-            params['technique'] = report_data.technique
-        
-        if report_data.findings is not None:
-            updates.append("findings = :findings")
-            params['findings'] = report_data.findings
-        
-        if report_data.impression is not None:
-            updates.append("impression = :impression")
-            params['impression'] = report_data.impression
-        
-        if report_data.recommendations is not None:
-            updates.append("recommendations = :recommendations")
-            params['recommendations'] = report_data.recommendations
+        params = {
+            'report_id': report_id,
+            'title': report_data.report_title,
+            'indication': report_data.clinical_indication,
+            'technique': report_data.technique,
+            'findings': report_data.findings,
+            'impression': report_data.impression,
+            'recommendations': report_data.recommendations,
+        }
         
-        if not updates:
+        if all(value is None for key, value in params.items() if key != 'report_id'):
             raise HTTPException(status_code=400, detail="No fields to update")
         
-        updates.append("updated_at = NOW()")
-        
-        query = f"UPDATE reports SET {', '.join(updates)} WHERE id = :report_id"
-        db.execute(text(query), params)
-        db.commit()
+        updated = (await db.execute(_UPDATE_REPORT_SQL, params)).first()
+        if not updated:
+            raise HTTPException(status_code=404, detail="Report not found")
+        await db.commit()
         
-        return {"message": "Report updated", "report_id": str(report_id)}
+        return {"message": "Report updated", "report_id": report_id}
         
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Failed to update report: {e}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -806,24 +1261,21 @@ async def update_report(
 async def publish_report(
     report_id: UUID,
     current_user: User = Depends(require_role(["radiologist"])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Publish report."""
     try:
-        db.execute(text("""
-            UPDATE reports 
-            SET report_status = 'published', published_at = NOW(), updated_at = NOW()
-            WHERE id = :report_id
-        """), {"report_id": str(report_id)})
+        await db.execute(_PUBLISH_REPORT_SQL, {"report_id": report_id})
         
-        db.commit()
+        await db.commit()
+        await invalidate_worklist_cache()
         logger.info(f" Report published: {report_id}")
         
-        return {"message": "Report published", "report_id": str(report_id)}
+        return {"message": "Report published", "report_id": report_id}
         
     except Exception as e:
         logger.error(f"Failed to publish: {e}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -831,43 +1283,31 @@ async def publish_report(
 async def unpublish_report(
     report_id: UUID,
     current_user: User = Depends(require_role(["radiologist"])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Unpublish report - makes it invisible to patient and editable again."""
     try:
-        # Check if report exists
-        result = db.execute(text("""
-            SELECT id, report_status 
-            FROM reports 
-            WHERE id = :report_id
-        """), {"report_id": str(report_id)})
-        
-        report = result.fetchone()
-        
-        if not report:
-            raise HTTPException(status_code=404, detail="Report not found")
-        
-        if report.report_status != 'published':
+        # Flip published -> draft in one statement; no row back means the
+        # report is missing or not published, told apart only on this path
+        result = await db.execute(_UNPUBLISH_REPORT_SQL, {"report_id": report_id})
+        
+        if result.first() is None:
+            await db.rollback()
+            exists = (await db.execute(_REPORT_STATUS_SQL, {"report_id": report_id})).first()
+            if not exists:
+                raise HTTPException(status_code=404, detail="Report not found")
             raise HTTPException(
                 status_code=400, 
                 detail="Report is not published. Only published reports can be unpublished."
             )
         
-        # Update report status to draft
-        db.execute(text("""
-            UPDATE reports 
-            SET report_status = 'draft', 
-                published_at = NULL, 
-                updated_at = NOW()
-            WHERE id = :report_id
-        """), {"report_id": str(report_id)})
-        
-        db.commit()
+        await db.commit()
+        await invalidate_worklist_cache()
         logger.info(f" Report unpublished: {report_id}")
         
         return {
             "message": "Report unpublished successfully",
-            "report_id": str(report_id),
+            "report_id": report_id,
             "status": "draft"
         }
         
@@ -875,54 +1315,69 @@ async def unpublish_report(
         raise
     except Exception as e:
         logger.error(f"Failed to unpublish: {e}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/profile")
 async def get_radiologist_profile(
     current_user: User = Depends(require_role(["radiologist"])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get radiologist profile."""
-    radiologist_profile = db.query(RadiologistProfile).filter(
-        RadiologistProfile.user_id == current_user.id
-    ).first()
-    
-    if not radiologist_profile:
-        raise HTTPException(status_code=404, detail="Radiologist profile not found")
+    professional = _RADIOLOGIST_PROFILE_CACHE.get(current_user.id)
+    if professional is None:
+        result = await db.execute(
+            select(RadiologistProfile)
+            .options(raiseload('*'))
+            .where(RadiologistProfile.user_id == current_user.id)
+        )
+        radiologist_profile = result.scalar_one_or_none()
+        
+        if not radiologist_profile:
+            raise HTTPException(status_code=404, detail="Radiologist profile not found")
+        
+        professional = {
+            "license_number": radiologist_profile.license_number,
+            "specialization": radiologist_profile.specialization,
+            "years_of_experience": radiologist_profile.years_of_experience,
+            "institution": radiologist_profile.institution,
+        }
+        _RADIOLOGIST_PROFILE_CACHE[current_user.id] = professional
     
     return {
-        "user_id": str(current_user.id),
+        "user_id": current_user.id,
         "first_name": current_user.first_name,
         "last_name": current_user.last_name,
         "email": current_user.email,
         "phone": current_user.phone,
-        "license_number": radiologist_profile.license_number,
-        "specialization": radiologist_profile.specialization,
-        "years_of_experience": radiologist_profile.years_of_experience,
-        "institution": radiologist_profile.institution,
+        **professional,
     }
 
-def check_and_alert_disagreement_threshold(db: Session):
-    """Check threshold and send email if exceeded."""
+
+def invalidate_radiologist_profile_cache(user_id) -> None:
+    """Drop a cached radiologist profile; call from any path that edits it."""
+    _RADIOLOGIST_PROFILE_CACHE.pop(user_id, None)
+
+
+async def check_and_alert_disagreement_threshold(db: AsyncSession, background_tasks: BackgroundTasks):
+    """Check threshold and send email (after the response) if exceeded."""
     THRESHOLD = 2  # or from settings
     WINDOW_HOURS = 24
     
     # Count overrides
-    result = db.execute(text("""
-        SELECT COUNT(*) FROM radiologist_feedback
-        WHERE feedback_type IN ('partial_override', 'full_override')
-          AND feedback_timestamp >= NOW() - INTERVAL :hours
-    """), {"hours": f"{WINDOW_HOURS} hours"})
+    result = await db.execute(_RECENT_OVERRIDES_SQL, {"hours": WINDOW_HOURS})
     
     count = result.scalar()
     
     if count >= THRESHOLD:
-        send_disagreement_alert_email(count, WINDOW_HOURS, db)
+        # smtplib is blocking and slow (TLS + login): sync background tasks run
+        # in the threadpool once the feedback response has been sent, and an
+        # SMTP failure can't fail the already-committed feedback
+        background_tasks.add_task(send_disagreement_alert_email, count, WINDOW_HOURS)
 
 
-def send_disagreement_alert_email(count, hours, db):
+def send_disagreement_alert_email(count, hours):
     """Send email using existing SMTP config."""
     msg = MIMEText(f"""
 AI Model Performance Alert - Radiologist Disagreement Threshold Exceeded
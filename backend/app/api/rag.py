@@ -5,11 +5,14 @@ from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 import httpx
+import importlib.util
 import logging
 import re
+import time
 import uuid
-from datetime import datetime, timedelta
+from cachetools import TTLCache
 
+from app.core.cache import cache_get, cache_set, get_redis
 from app.core.config import settings
 from app.core.security import get_current_user
 from app.models.user import User
@@ -17,8 +20,78 @@ from app.models.user import User
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-# In-memory job storage (use Redis in production)
-rag_jobs = {}
+# Job state lives in Redis when configured, so any worker can answer a
+# status poll; otherwise in a bounded per-process cache. Either way a job
+# is dropped _JOB_TTL_SECONDS after its last update (the frontend stops
+# polling after 5 minutes). Only touched from the event loop thread, so
+# the TTLCache needs no lock.
+_JOB_TTL_SECONDS = 600
+_local_jobs = TTLCache(maxsize=10_000, ttl=_JOB_TTL_SECONDS)
+
+
+def _job_key(job_id: str) -> str:
+    """Redis key holding a job's state."""
+    return f"rag:job:{job_id}"
+
+
+async def _save_job(job_id: str, job: dict) -> None:
+    """Store a job's state (JSON-serializable dict)."""
+    if get_redis() is None:
+        _local_jobs[job_id] = job
+    else:
+        await cache_set(_job_key(job_id), job, _JOB_TTL_SECONDS)
+
+
+async def _load_job(job_id: str) -> Optional[dict]:
+    """Current state of a job, or None if unknown or dropped."""
+    if get_redis() is None:
+        return _local_jobs.get(job_id)
+    return await cache_get(_job_key(job_id))
+
+
+# One pooled client for all RAG endpoint calls, so keep-alive connections
+# (and their TLS sessions) are reused across requests. Timeouts are passed
+# per call. HTTP/2 when the h2 extra is installed.
+_rag_client: Optional[httpx.AsyncClient] = None
+
+
+def get_rag_client() -> httpx.AsyncClient:
+    """Shared AsyncClient for the RAG endpoint, created on first use."""
+    global _rag_client
+    if _rag_client is None or _rag_client.is_closed:
+        _rag_client = httpx.AsyncClient(
+            http2=importlib.util.find_spec("h2") is not None,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        )
+    return _rag_client
+
+
+async def close_rag_client() -> None:
+    """Close the shared client (app shutdown)."""
+    global _rag_client
+    if _rag_client is not None:
+        await _rag_client.aclose()
+        _rag_client = None
+
+
+# clean_rag_response patterns, compiled once
+_RE_SEPARATOR = re.compile(r'\n*---+\n*')
+_RE_ANSWER_LABEL = re.compile(r'^(Answer:|Answer\s*:)\s*', re.IGNORECASE)
+_RE_SENTENCE_SPLIT = re.compile(r'(?<=[.!?])\s+')
+_RE_WHITESPACE = re.compile(r'\s+')
+_RE_LEADING_NUMBER = re.compile(r'^\d+\.\s*')
+_RE_REPEATED_WORD = re.compile(r'-(\w+)-\1')
+_RE_MD_LINK = re.compile(r'\[([^\]]+)\]\(([^)]+)\)')
+
+
+def _cut_section(text: str, marker: str, fallback: str) -> str:
+    """Text before marker (or, if absent, before fallback), stripped."""
+    for m in (marker, fallback):
+        idx = text.find(m)
+        if idx != -1:
+            return text[:idx].strip()
+    return text
+
 
 class ChatMessage(BaseModel):
     role: str
@@ -77,66 +150,57 @@ def clean_rag_response(prediction: Dict) -> tuple[str, List[Dict[str, str]]]:
     
     # Step 1: Remove everything after "Limitations:"
     # Pattern: "Limitations: While the provided documents..."
-    if "Limitations:" in raw_answer:
-        answer = raw_answer.split("Limitations:")[0].strip()
-    elif "Limitation:" in raw_answer:
-        answer = raw_answer.split("Limitation:")[0].strip()
-    else:
-        answer = raw_answer
+    answer = _cut_section(raw_answer, "Limitations:", "Limitation:")
     
     # Step 2: Remove "**References:**" section (everything after it)
-    if "**References:**" in answer:
-        answer = answer.split("**References:**")[0].strip()
-    elif "References:" in answer:
-        answer = answer.split("References:")[0].strip()
+    answer = _cut_section(answer, "**References:**", "References:")
     
     # Step 3: Remove "---" separator line
-    answer = re.sub(r'\n*---+\n*', '', answer).strip()
+    answer = _RE_SEPARATOR.sub('', answer).strip()
     
     # Step 4: Remove "**Important:**" disclaimer section
-    if "**Important:**" in answer:
-        answer = answer.split("**Important:**")[0].strip()
-    elif "Important:" in answer:
-        answer = answer.split("Important:")[0].strip()
+    answer = _cut_section(answer, "**Important:**", "Important:")
     
     # Step 5: Remove any "Answer:" labels at the start
-    answer = re.sub(r'^(Answer:|Answer\s*:)\s*', '', answer, flags=re.IGNORECASE).strip()
+    answer = _RE_ANSWER_LABEL.sub('', answer).strip()
     
-    # Step 6: Remove duplicate paragraphs (paragraph-level deduplication)
-    paragraphs = answer.split('\n\n')
+    # Steps 6-7: Remove duplicate paragraphs, then repeated sentences, in
+    # one pass over the paragraphs. A paragraph that doesn't end a sentence
+    # runs into the next one, so its last fragment is carried over.
     seen_paragraphs = set()
-    unique_paragraphs = []
-    
-    for para in paragraphs:
-        para = para.strip()
-        if not para:
-            continue
-        
-        # Normalize for comparison
-        normalized = ' '.join(para.lower().split())
-        
-        if normalized not in seen_paragraphs:
-            seen_paragraphs.add(normalized)
-            unique_paragraphs.append(para)
-    
-    answer = '\n\n'.join(unique_paragraphs)
-    
-    # Step 7: Remove repetitive sentences within text
-    sentences = re.split(r'(?<=[.!?])\s+', answer)
     seen_sentences = set()
     unique_sentences = []
     
-    for sentence in sentences:
+    def add_sentence(sentence: str):
         sentence = sentence.strip()
         if not sentence:
-            continue
-        
+            return
         normalized = ' '.join(sentence.lower().split())
-        
         if normalized not in seen_sentences:
             seen_sentences.add(normalized)
             unique_sentences.append(sentence)
     
+    carry = ''
+    for para in answer.split('\n\n'):
+        para = para.strip()
+        if not para:
+            continue
+        
+        # Normalize for comparison
+        normalized = ' '.join(para.lower().split())
+        if normalized in seen_paragraphs:
+            continue
+        seen_paragraphs.add(normalized)
+        
+        sentences = _RE_SENTENCE_SPLIT.split(para)
+        if carry:
+            sentences[0] = carry + '\n\n' + sentences[0]
+        carry = '' if para[-1] in '.!?' else sentences.pop()
+        for sentence in sentences:
+            add_sentence(sentence)
+    if carry:
+        add_sentence(carry)
+    
     answer = ' '.join(unique_sentences)
     
     # Step 8: Remove incomplete sentence at the end
@@ -151,9 +215,7 @@ def clean_rag_response(prediction: Dict) -> tuple[str, List[Dict[str, str]]]:
             answer = answer[:last_period + 1].strip()
     
     # Step 9: Final whitespace cleanup
-    answer = re.sub(r'\s+', ' ', answer)  # Multiple spaces to single
-    answer = re.sub(r'\n{3,}', '\n\n', answer)  # Max 2 newlines
-    answer = answer.strip()
+    answer = _RE_WHITESPACE.sub(' ', answer).strip()  # Also folds newlines
     
     # Step 10: Extract sources from stats.sources (structured data!)
     sources = []
@@ -166,10 +228,10 @@ def clean_rag_response(prediction: Dict) -> tuple[str, List[Dict[str, str]]]:
         if title and link and link.startswith('http'):
             # Clean title (remove extra characters)
             title = title.replace('__', '').strip()
-            title = re.sub(r'^\d+\.\s*', '', title)  # Remove leading numbers
+            title = _RE_LEADING_NUMBER.sub('', title)  # Remove leading numbers
             
             # Remove "-Tuberculosis-Tuberculosis" type duplicates in title
-            title = re.sub(r'-(\w+)-\1', r'-\1', title)
+            title = _RE_REPEATED_WORD.sub(r'-\1', title)
             
             sources.append({
                 "title": title,
@@ -178,13 +240,13 @@ def clean_rag_response(prediction: Dict) -> tuple[str, List[Dict[str, str]]]:
     
     # If no sources in stats, try extracting from markdown links in original answer
     if not sources:
-        markdown_links = re.findall(r'\[([^\]]+)\]\(([^)]+)\)', raw_answer)
+        markdown_links = _RE_MD_LINK.findall(raw_answer)
         seen_urls = set()
         
         for title, url in markdown_links:
             if url.startswith('http') and url not in seen_urls:
                 clean_title = title.strip().replace('__', '').strip()
-                clean_title = re.sub(r'^\d+\.\s*', '', clean_title)
+                clean_title = _RE_LEADING_NUMBER.sub('', clean_title)
                 sources.append({"title": clean_title, "url": url.strip()})
                 seen_urls.add(url)
         
@@ -193,15 +255,16 @@ def clean_rag_response(prediction: Dict) -> tuple[str, List[Dict[str, str]]]:
     return answer, sources
 
 
-async def process_rag_job(job_id: str, message: str):
+async def process_rag_job(job_id: str, job: dict):
     """Background task to process RAG request."""
     try:
         logger.info(f"[Job {job_id}] Starting RAG processing...")
         
-        rag_jobs[job_id]["status"] = "processing"
-        rag_jobs[job_id]["progress"] = 20
+        job["status"] = "processing"
+        job["progress"] = 20
+        await _save_job(job_id, job)
         
-        rag_request = {"instances": [{"query": message}]}
+        rag_request = {"instances": [{"query": job["message"]}]}
         
         timeout_config = httpx.Timeout(
             connect=30.0,
@@ -210,21 +273,24 @@ async def process_rag_job(job_id: str, message: str):
             pool=30.0
         )
         
-        rag_jobs[job_id]["progress"] = 40
+        job["progress"] = 40
+        await _save_job(job_id, job)
         
-        async with httpx.AsyncClient(timeout=timeout_config) as client:
-            response = await client.post(
-                settings.RAG_ENDPOINT_URL,
-                json=rag_request,
-                headers={"Content-Type": "application/json"}
-            )
-            
-            rag_jobs[job_id]["progress"] = 80
-            
-            if response.status_code != 200:
-                raise Exception(f"RAG endpoint returned {response.status_code}")
-            
-            result = response.json()
+        client = get_rag_client()
+        response = await client.post(
+            settings.RAG_ENDPOINT_URL,
+            json=rag_request,
+            headers={"Content-Type": "application/json"},
+            timeout=timeout_config,
+        )
+        
+        job["progress"] = 80
+        await _save_job(job_id, job)
+        
+        if response.status_code != 200:
+            raise Exception(f"RAG endpoint returned {response.status_code}")
+        
+        result = response.json()
         
         if not result.get("predictions"):
             raise Exception("Invalid RAG response - no predictions")
@@ -245,25 +311,27 @@ async def process_rag_job(job_id: str, message: str):
         logger.info(f"[Job {job_id}] Cleaned: {len(cleaned_answer)} chars, {len(sources)} sources")
         
         # Store result
-        rag_jobs[job_id]["status"] = "completed"
-        rag_jobs[job_id]["progress"] = 100
-        rag_jobs[job_id]["result"] = ChatResponse(
+        job["status"] = "completed"
+        job["progress"] = 100
+        job["result"] = ChatResponse(
             response=cleaned_answer,
             sources=sources,
             stats={
                 "confidence": prediction.get("stats", {}).get("avg_retrieval_score"),
                 "num_docs": prediction.get("stats", {}).get("num_retrieved_docs")
             }
-        )
-        rag_jobs[job_id]["completed_at"] = datetime.utcnow()
+        ).model_dump()
+        job["completed_at"] = time.time()
+        await _save_job(job_id, job)
         
         logger.info(f"[Job {job_id}] Completed successfully")
         
     except Exception as e:
         logger.error(f"[Job {job_id}] ✗ Failed: {e}")
-        rag_jobs[job_id]["status"] = "failed"
-        rag_jobs[job_id]["error"] = str(e)
-        rag_jobs[job_id]["completed_at"] = datetime.utcnow()
+        job["status"] = "failed"
+        job["error"] = str(e)
+        job["completed_at"] = time.time()
+        await _save_job(job_id, job)
 
 
 @router.post("/chat/start", response_model=JobStartResponse)
@@ -275,15 +343,16 @@ async def start_chat_job(
     """Start RAG processing in background."""
     job_id = str(uuid.uuid4())
     
-    rag_jobs[job_id] = {
+    job = {
         "status": "pending",
         "progress": 0,
-        "created_at": datetime.utcnow(),
+        "created_at": time.time(),
         "user_id": str(current_user.id),
         "message": request.message
     }
+    await _save_job(job_id, job)
     
-    background_tasks.add_task(process_rag_job, job_id, request.message)
+    background_tasks.add_task(process_rag_job, job_id, job)
     
     logger.info(f"[Job {job_id}] Created for user {current_user.email}")
     
@@ -300,19 +369,13 @@ async def get_job_status(
     current_user: User = Depends(get_current_user)
 ):
     """Get status of RAG processing job."""
-    if job_id not in rag_jobs:
-        raise HTTPException(status_code=404, detail="Job not found")
-    
-    job = rag_jobs[job_id]
+    job = await _load_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
     
     if job["user_id"] != str(current_user.id):
         raise HTTPException(status_code=403, detail="Access denied")
     
-    created_at = job["created_at"]
-    if datetime.utcnow() - created_at > timedelta(minutes=10):
-        job["status"] = "failed"
-        job["error"] = "Job expired"
-    
     return JobStatusResponse(
         job_id=job_id,
         status=job["status"],
@@ -340,24 +403,25 @@ async def chat_with_rag(
             pool=10.0
         )
         
-        async with httpx.AsyncClient(timeout=timeout_config) as client:
-            try:
-                response = await client.post(
-                    settings.RAG_ENDPOINT_URL,
-                    json=rag_request,
-                    headers={"Content-Type": "application/json"}
-                )
-                
-                if response.status_code != 200:
-                    raise HTTPException(status_code=502, detail="AI assistant temporarily unavailable")
-                
-                result = response.json()
-                
-            except httpx.TimeoutException:
-                raise HTTPException(
-                    status_code=504,
-                    detail="Response taking too long. Use /chat/start endpoint."
-                )
+        client = get_rag_client()
+        try:
+            response = await client.post(
+                settings.RAG_ENDPOINT_URL,
+                json=rag_request,
+                headers={"Content-Type": "application/json"},
+                timeout=timeout_config,
+            )
+            
+            if response.status_code != 200:
+                raise HTTPException(status_code=502, detail="AI assistant temporarily unavailable")
+            
+            result = response.json()
+            
+        except httpx.TimeoutException:
+            raise HTTPException(
+                status_code=504,
+                detail="Response taking too long. Use /chat/start endpoint."
+            )
         
         if not result.get("predictions"):
             raise HTTPException(status_code=500, detail="Invalid response from RAG model")
@@ -398,22 +462,23 @@ async def check_rag_health():
     try:
         timeout_config = httpx.Timeout(10.0)
         
-        async with httpx.AsyncClient(timeout=timeout_config) as client:
-            test_request = {"instances": [{"query": "test"}]}
-            
-            response = await client.post(
-                settings.RAG_ENDPOINT_URL,
-                json=test_request,
-                headers={"Content-Type": "application/json"}
-            )
-            
-            is_healthy = response.status_code == 200
-            
-            return {
-                "status": "healthy" if is_healthy else "unhealthy",
-                "endpoint": settings.RAG_ENDPOINT_URL,
-                "status_code": response.status_code
-            }
+        client = get_rag_client()
+        test_request = {"instances": [{"query": "test"}]}
+        
+        response = await client.post(
+            settings.RAG_ENDPOINT_URL,
+            json=test_request,
+            headers={"Content-Type": "application/json"},
+            timeout=timeout_config,
+        )
+        
+        is_healthy = response.status_code == 200
+        
+        return {
+            "status": "healthy" if is_healthy else "unhealthy",
+            "endpoint": settings.RAG_ENDPOINT_URL,
+            "status_code": response.status_code
+        }
     except Exception as e:
         logger.error(f"RAG health check failed: {e}")
         return {
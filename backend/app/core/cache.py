@@ -0,0 +1,175 @@
+"""
+Shared Redis cache
+
+Optional: when REDIS_URL is not configured every call is a no-op / miss,
+so callers can use the cache unconditionally. Redis errors are logged
+and treated as misses rather than failing the request.
+"""
+
+from typing import List, Optional
+import logging
+
+import orjson
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_client = None
+_sync_client = None
+
+
+def get_redis():
+    """Return the shared async Redis client, or None if caching is disabled."""
+    global _client
+    if _client is None and settings.REDIS_URL:
+        import redis.asyncio as aioredis
+        _client = aioredis.from_url(settings.REDIS_URL)
+    return _client
+
+
+def get_redis_sync():
+    """Blocking Redis client for code without an event loop (Celery tasks)."""
+    global _sync_client
+    if _sync_client is None and settings.REDIS_URL:
+        import redis
+        _sync_client = redis.Redis.from_url(settings.REDIS_URL)
+    return _sync_client
+
+
+async def cache_get(key: str) -> Optional[dict]:
+    """Get a JSON value from cache."""
+    client = get_redis()
+    if client is None:
+        return None
+    try:
+        raw = await client.get(key)
+        return orjson.loads(raw) if raw is not None else None
+    except Exception as e:
+        logger.warning(f"Cache get failed for {key}: {e}")
+        return None
+
+
+async def cache_set(key: str, value, ttl: int) -> None:
+    """Store a JSON-serializable value with a TTL (seconds)."""
+    client = get_redis()
+    if client is None:
+        return
+    try:
+        await client.setex(key, ttl, orjson.dumps(value))
+    except Exception as e:
+        logger.warning(f"Cache set failed for {key}: {e}")
+
+
+async def cache_delete(*keys: str) -> None:
+    """Delete keys from cache."""
+    client = get_redis()
+    if client is None or not keys:
+        return
+    try:
+        await client.delete(*keys)
+    except Exception as e:
+        logger.warning(f"Cache delete failed for {keys}: {e}")
+
+
+def cache_delete_sync(*keys: str) -> None:
+    """cache_delete for sync callers."""
+    client = get_redis_sync()
+    if client is None or not keys:
+        return
+    try:
+        client.delete(*keys)
+    except Exception as e:
+        logger.warning(f"Cache delete failed for {keys}: {e}")
+
+
+async def cache_set_indexed(key: str, value, ttl: int, index_key: str, index_ttl: int) -> None:
+    """
+    Store a JSON value with a TTL and record its key in an index set,
+    so cache_delete_indexed(index_key) can drop every key filed under it.
+    index_ttl should be at least the longest TTL of any key in the index.
+    """
+    client = get_redis()
+    if client is None:
+        return
+    try:
+        async with client.pipeline(transaction=False) as pipe:
+            pipe.setex(key, ttl, orjson.dumps(value))
+            pipe.sadd(index_key, key)
+            pipe.expire(index_key, index_ttl)
+            await pipe.execute()
+    except Exception as e:
+        logger.warning(f"Cache set failed for {key}: {e}")
+
+
+async def cache_delete_indexed(index_key: str) -> None:
+    """Delete every key recorded in an index set, and the set itself."""
+    client = get_redis()
+    if client is None:
+        return
+    try:
+        keys = await client.smembers(index_key)
+        await client.delete(index_key, *keys)
+    except Exception as e:
+        logger.warning(f"Cache delete failed for {index_key}: {e}")
+
+
+async def cache_hget_raw(key: str, field: str) -> Optional[bytes]:
+    """Get stored bytes from a hash field (no JSON decoding)."""
+    client = get_redis()
+    if client is None:
+        return None
+    try:
+        return await client.hget(key, field)
+    except Exception as e:
+        logger.warning(f"Cache hget failed for {key}[{field}]: {e}")
+        return None
+
+
+async def cache_hset_raw(key: str, field: str, value: bytes, ttl: int) -> None:
+    """
+    Store bytes in a hash field.
+    
+    The hash expires ttl seconds after its first write (EXPIRE is only set
+    when the key has none, so later fields don't extend it), so every field
+    is gone within ttl and one cache_delete(key) drops them all.
+    """
+    client = get_redis()
+    if client is None:
+        return
+    try:
+        async with client.pipeline(transaction=False) as pipe:
+            pipe.hset(key, field, value)
+            pipe.ttl(key)
+            _, remaining = await pipe.execute()
+        if remaining < 0:
+            await client.expire(key, ttl)
+    except Exception as e:
+        logger.warning(f"Cache hset failed for {key}[{field}]: {e}")
+
+
+async def cache_get_many(keys: List[str]) -> List[Optional[dict]]:
+    """Get several JSON values in one round trip (MGET); misses are None."""
+    client = get_redis()
+    if client is None or not keys:
+        return [None] * len(keys)
+    try:
+        raws = await client.mget(keys)
+        return [orjson.loads(raw) if raw is not None else None for raw in raws]
+    except Exception as e:
+        logger.warning(f"Cache mget failed for {len(keys)} keys: {e}")
+        return [None] * len(keys)
+
+
+async def cache_set_many(values: dict, ttl: int) -> None:
+    """Store several JSON-serializable values with one TTL, pipelined."""
+    client = get_redis()
+    if client is None or not values:
+        return
+    try:
+        async with client.pipeline(transaction=False) as pipe:
+            for key, value in values.items():
+                pipe.setex(key, ttl, orjson.dumps(value))
+            await pipe.execute()
+    except Exception as e:
+        logger.warning(f"Cache set failed for {len(values)} keys: {e}")
@@ -1,14 +1,48 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+from uuid import uuid4
+import orjson
 from app.core.config import settings
 
+# Pool settings. Behind a transaction-mode pooler the pooler multiplexes
+# connections onto a small set of Postgres backends, so each worker keeps
+# only a few client connections to it (or none: NullPool) rather than a
+# full pool of its own.
+if settings.DB_TRANSACTION_POOLER and settings.DB_POOLER_POOL_SIZE <= 0:
+    _pool_args = {"poolclass": NullPool}
+elif settings.DB_TRANSACTION_POOLER:
+    _pool_args = {
+        "pool_size": settings.DB_POOLER_POOL_SIZE,
+        "max_overflow": settings.DB_POOLER_POOL_SIZE,
+        "pool_pre_ping": True,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+    }
+else:
+    _pool_args = {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_pre_ping": True,  # Verifying connections before using them
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+    }
+
 # Creating engine with PostgreSQL-specific settings
+# JSON/JSONB columns are (de)serialized with orjson
+def _json_serializer(value) -> str:
+    return orjson.dumps(value).decode()
+
+
 engine = create_engine(
     settings.DATABASE_URL,
-    pool_pre_ping=True,  # Verifying connections before using them
-    pool_recycle=3600,   # Recycling connections after 1 hour
-    echo=False,         
+    **_pool_args,
+    echo=False,
+    json_serializer=_json_serializer,
+    json_deserializer=orjson.loads,
     connect_args={
         "connect_timeout": 10,
         "sslmode": "require",
@@ -17,8 +51,62 @@ engine = create_engine(
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine (asyncpg) used by the API routers so DB round trips
+# don't block the event loop. Same database, different driver.
+# Prepared statements are cached per connection so repeated queries
+# skip server-side parse/plan. A transaction pooler may hand each
+# transaction a different backend, so there the caches are disabled and
+# statement names made unique.
+_statement_cache_size = 0 if settings.DB_TRANSACTION_POOLER else settings.DB_STATEMENT_CACHE_SIZE
+
+ASYNC_DATABASE_URL = make_url(settings.DATABASE_URL).set(
+    drivername="postgresql+asyncpg"
+).update_query_dict({"prepared_statement_cache_size": str(_statement_cache_size)})
+
+_async_connect_args = {
+    "timeout": 10,
+    "ssl": "require",
+}
+if settings.DB_TRANSACTION_POOLER:
+    _async_connect_args.update(
+        statement_cache_size=0,
+        prepared_statement_name_func=lambda: f"__asyncpg_{uuid4()}__",
+    )
+
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    **_pool_args,
+    echo=False,
+    json_serializer=_json_serializer,
+    json_deserializer=orjson.loads,
+    connect_args=_async_connect_args
+)
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 Base = declarative_base()
 
+
+def pool_stats() -> dict:
+    """Connection counts for both engines' pools, for /health."""
+    stats = {}
+    for name, pool in (("sync", engine.pool), ("async", async_engine.pool)):
+        if isinstance(pool, NullPool):
+            stats[name] = {"pool": "null"}
+            continue
+        stats[name] = {
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "overflow": max(pool.overflow(), 0),  # negative until size is reached
+            "idle": pool.checkedin(),
+        }
+    return stats
+
 def get_db():
     """
     Dependency function to get database session.
@@ -31,4 +119,16 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    """
+    Dependency function to get an async database session.
+    Usage in FastAPI endpoints:
+        @app.get("/items")
+        async def read_items(db: AsyncSession = Depends(get_async_db)):
+            result = await db.execute(select(Item))
+            ...
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
\ No newline at end of file
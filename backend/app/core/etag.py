@@ -0,0 +1,26 @@
+"""
+Conditional GET helpers
+
+Detail views send a weak ETag built from the row's key and timestamps and
+answer a matching If-None-Match with an empty 304.
+"""
+
+from fastapi import Request, Response
+
+# Detail views revalidate via ETag built from the row's updated_at
+DETAIL_CACHE_CONTROL = "private, max-age=60"
+
+
+def detail_etag(row_id, updated_at, *extra) -> str:
+    """Weak ETag for a detail response."""
+    parts = [str(row_id), str(int(updated_at.timestamp())) if updated_at else "0"]
+    parts.extend(str(p) for p in extra)
+    return 'W/"' + "-".join(parts) + '"'
+
+
+def not_modified(request: Request, etag: str) -> tuple:
+    """Response headers for etag, and a 304 if the client already has it (else None)."""
+    headers = {"ETag": etag, "Cache-Control": DETAIL_CACHE_CONTROL}
+    if request.headers.get("if-none-match") == etag:
+        return headers, Response(status_code=304, headers=headers)
+    return headers, None
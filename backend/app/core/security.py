@@ -1,17 +1,26 @@
-from datetime import datetime, timedelta
+from datetime import datetime, date, timedelta
 from typing import Optional
-from jose import JWTError, jwt
+import hashlib
+import uuid
+import time
+import jwt
 from passlib.context import CryptContext
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.config import settings
-from app.core.database import get_db
-from app.models.user import User
+from app.core.cache import cache_get, cache_delete, cache_set_indexed, cache_delete_indexed
+from app.core.database import get_async_db
+from app.models.user import User, UserRole, UserStatus
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 security = HTTPBearer()
 
+# Decode settings are fixed for the process; build them once
+_JWT_ALGORITHMS = [settings.ALGORITHM]
+_JWT_OPTIONS = {"require": ["exp", "sub"]}
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against a hash."""
     return pwd_context.verify(plain_password, hashed_password)
@@ -35,21 +44,86 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
 def decode_token(token: str) -> dict:
     """Decode and verify a JWT token."""
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        payload = jwt.decode(
+            token, settings.SECRET_KEY, algorithms=_JWT_ALGORITHMS, options=_JWT_OPTIONS
+        )
         return payload
-    except JWTError:
+    except jwt.PyJWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+def token_cache_key(token: str) -> str:
+    """Cache key for a token (the raw token is never stored)."""
+    return "user:" + hashlib.sha256(token.encode()).hexdigest()
+
+def _user_to_cache(user: User) -> dict:
+    """Non-sensitive user fields needed by endpoints and role checks."""
+    return {
+        "id": str(user.id),
+        "email": user.email,
+        "role": user.role.value if isinstance(user.role, UserRole) else user.role,
+        "status": user.status.value if isinstance(user.status, UserStatus) else user.status,
+        "first_name": user.first_name,
+        "last_name": user.last_name,
+        "phone": user.phone,
+        "date_of_birth": user.date_of_birth.isoformat() if user.date_of_birth else None,
+        "created_at": user.created_at.isoformat() if user.created_at else None,
+        "last_login": user.last_login.isoformat() if user.last_login else None,
+    }
+
+def _user_from_cache(data: dict) -> User:
+    """Rebuild a transient User from cached fields."""
+    return User(
+        id=uuid.UUID(data["id"]),
+        email=data["email"],
+        role=UserRole(data["role"]),
+        status=UserStatus(data["status"]) if data["status"] else None,
+        first_name=data["first_name"],
+        last_name=data["last_name"],
+        phone=data["phone"],
+        date_of_birth=date.fromisoformat(data["date_of_birth"]) if data["date_of_birth"] else None,
+        created_at=datetime.fromisoformat(data["created_at"]) if data["created_at"] else None,
+        last_login=datetime.fromisoformat(data["last_login"]) if data["last_login"] else None,
+    )
+
+def _user_tokens_key(user_id) -> str:
+    """Index of a user's cached token keys."""
+    return f"user-tokens:{user_id}"
+
+async def invalidate_token_cache(token: str) -> None:
+    """Drop the cached user for a token (e.g. on logout)."""
+    await cache_delete(token_cache_key(token))
+
+async def invalidate_user_cache(user_id) -> None:
+    """Drop every cached token for a user; call after a role or status change."""
+    await cache_delete_indexed(_user_tokens_key(user_id))
+
 async def get_current_user(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> User:
     """Get current authenticated user from token."""
+    # Already resolved for this request (e.g. called again outside the DI cache)
+    current = getattr(request.state, "current_user", None)
+    if current is not None:
+        return current
+    
     token = credentials.credentials
+    
+    # A cache hit means this exact token was already verified; only the
+    # expiry still needs checking, so the signature isn't re-verified.
+    # The cached role is trusted for up to TOKEN_CACHE_TTL_SECONDS, or until
+    # invalidate_user_cache() drops the user's entries.
+    key = token_cache_key(token)
+    cached = await cache_get(key)
+    if cached is not None and cached.get("exp", 0) > time.time():
+        request.state.current_user = _user_from_cache(cached)
+        return request.state.current_user
+    
     payload = decode_token(token)
     
     user_id: str = payload.get("sub")
@@ -59,15 +133,30 @@ async def get_current_user(
             detail="Could not validate credentials"
         )
     
-    user = db.query(User).filter(User.id == user_id).first()
+    result = await db.execute(select(User).where(User.id == user_id))
+    user = result.scalar_one_or_none()
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found"
         )
     
+    ttl = min(settings.TOKEN_CACHE_TTL_SECONDS, int(payload["exp"] - time.time()))
+    if ttl > 0:
+        await cache_set_indexed(
+            key,
+            {**_user_to_cache(user), "exp": payload["exp"]},
+            ttl,
+            _user_tokens_key(user.id),
+            settings.TOKEN_CACHE_TTL_SECONDS,
+        )
+    request.state.current_user = user
     return user
 
+# One checker per role set, so FastAPI's per-request dependency cache
+# treats every require_role([...]) with the same roles as one dependency
+_ROLE_CHECKERS = {}
+
 def require_role(allowed_roles: list):
     """
     Dependency to check if user has required role.
@@ -76,6 +165,11 @@ def require_role(allowed_roles: list):
         def get_scans(user: User = Depends(require_role(["radiologist"]))):
             ...
     """
+    roles = tuple(sorted(allowed_roles))
+    checker = _ROLE_CHECKERS.get(roles)
+    if checker is not None:
+        return checker
+    
     async def role_checker(user: User = Depends(get_current_user)) -> User:
         if user.role not in allowed_roles:
             raise HTTPException(
@@ -83,4 +177,6 @@ def require_role(allowed_roles: list):
                 detail=f"Access denied. Required role: {', '.join(allowed_roles)}"
             )
         return user
-    return role_checker
\ No newline at end of file
+    
+    _ROLE_CHECKERS[roles] = role_checker
+    return role_checker
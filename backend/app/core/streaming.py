@@ -0,0 +1,55 @@
+"""
+Streaming list responses
+
+Rows are serialized with orjson and sent as Postgres produces them
+(server-side cursor), so peak memory doesn't grow with the result size.
+"""
+
+from fastapi.responses import StreamingResponse
+import logging
+
+import orjson
+
+from app.core.database import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+async def stream_rows(statement, params: dict, to_dict, fmt: str, label: str) -> StreamingResponse:
+    """
+    Stream query rows to the client as they arrive from Postgres.
+    
+    fmt="array" emits a JSON array (the default the portal expects);
+    fmt="ndjson" emits one JSON object per line.
+    
+    The session is owned by the response, not by a Depends() dependency,
+    because dependency teardown runs before a streaming body is sent.
+    The query is started here so errors still surface as a 500.
+    """
+    session = AsyncSessionLocal()
+    try:
+        result = await session.stream(statement, params)
+    except Exception:
+        await session.close()
+        raise
+    
+    async def body():
+        count = 0
+        try:
+            if fmt != "ndjson":
+                yield b"["
+            async for row in result.mappings():
+                chunk = orjson.dumps(to_dict(row))
+                if fmt == "ndjson":
+                    yield chunk + b"\n"
+                else:
+                    yield (b"," + chunk) if count else chunk
+                count += 1
+            if fmt != "ndjson":
+                yield b"]"
+            logger.info(f"Streamed {count} {label}")
+        finally:
+            await session.close()
+    
+    media_type = "application/x-ndjson" if fmt == "ndjson" else "application/json"
+    return StreamingResponse(body(), media_type=media_type)
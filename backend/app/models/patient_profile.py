@@ -1,8 +1,10 @@
 from sqlalchemy import Column, String, Integer, Text, DateTime, ForeignKey, Numeric
 from sqlalchemy.dialects.postgresql import UUID, ARRAY
+from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import uuid
 from app.core.database import Base
+from app.models.user import User
 
 class PatientProfile(Base):
     __tablename__ = "patient_profiles"
@@ -30,5 +32,8 @@ class PatientProfile(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
+    # Relationships - never lazy-loaded; use joinedload()/selectinload() explicitly
+    user = relationship(User, lazy="raise")
+    
     def __repr__(self):
         return f"<PatientProfile {self.patient_id}>"
\ No newline at end of file
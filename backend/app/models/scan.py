@@ -1,9 +1,12 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, Enum as SQLEnum, Text, ARRAY, Boolean
+from sqlalchemy import Column, String, DateTime, ForeignKey, Enum as SQLEnum, Text, ARRAY, Boolean, SmallInteger, Computed
 from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import uuid
 import enum
 from app.core.database import Base
+from app.models.scan_image import ScanImage
+from app.models.patient_profile import PatientProfile
 
 class ScanStatus(str, enum.Enum):
     pending = "pending"
@@ -44,6 +47,10 @@ class Scan(Base):
     examination_type = Column(SQLEnum(ExaminationType), nullable=False)
     body_region = Column(SQLEnum(BodyRegion), nullable=False)
     urgency_level = Column(SQLEnum(UrgencyLevel), default=UrgencyLevel.routine)
+    # Worklist sort key (1 = emergent), maintained by Postgres
+    urgency_rank = Column(SmallInteger, Computed(
+        "CASE urgency_level WHEN 'emergent' THEN 1 WHEN 'urgent' THEN 2 ELSE 3 END", persisted=True
+    ))
     presenting_symptoms = Column(ARRAY(Text))
     current_medications = Column(ARRAY(Text))
     previous_surgeries = Column(ARRAY(Text))
@@ -71,6 +78,10 @@ class Scan(Base):
     radiologist_review_started_at = Column(DateTime(timezone=True))
     radiologist_review_completed_at = Column(DateTime(timezone=True))
     
+    # Relationships - never lazy-loaded; use joinedload()/selectinload() explicitly
+    images = relationship(ScanImage, lazy="raise", order_by=ScanImage.image_order)
+    patient_profile = relationship(PatientProfile, lazy="raise")
+    
     def __repr__(self):
         return f"<Scan {self.scan_number}>"
     
@@ -25,6 +25,10 @@ class ScanImage(Base):
     # DICOM metadata
     dicom_metadata = Column(JSONB)
     
+    # Pre-signed read URL (set at upload, refreshed when close to expiry)
+    signed_url = Column(Text)
+    signed_url_expires_at = Column(DateTime(timezone=True))
+    
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     def __repr__(self):
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, String, Enum, DateTime, Date
+from sqlalchemy import Column, String, Enum, DateTime, Date, Text, Computed
+from sqlalchemy.orm import deferred
 from sqlalchemy.dialects.postgresql import UUID as PostgreSQL_UUID
 from sqlalchemy.types import TypeDecorator, CHAR
 from sqlalchemy.sql import func
@@ -60,6 +61,8 @@ class User(Base):
     
     first_name = Column(String(100), nullable=False)
     last_name = Column(String(100), nullable=False)
+    # Maintained by Postgres; only loaded when a query asks for it
+    full_name = deferred(Column(Text, Computed("first_name || ' ' || last_name", persisted=True)))
     phone = Column(String(20))
     date_of_birth = Column(Date)
     
@@ -3,17 +3,45 @@ GCS Storage Service for MedScan Web Platform
 Handles image uploads and MLOps sync with proper class folder structure
 """
 import os
+import asyncio
+import threading
+import time
 from pathlib import Path
-from typing import Optional, List
-from datetime import timedelta, datetime
+from typing import BinaryIO, Optional, List, Tuple
+from datetime import timedelta, datetime, timezone
 from io import BytesIO
 import logging
 
+import orjson
+from cachetools import TTLCache
 from google.cloud import storage
+from google.cloud.storage import transfer_manager
 from google.cloud.exceptions import NotFound
 
 logger = logging.getLogger(__name__)
 
+# Pre-signed URLs stored on scan_images live this long...
+PRESIGNED_URL_TTL = 24 * 3600
+# ...and are re-signed once they get this close to expiry
+PRESIGNED_URL_REFRESH_MARGIN = 300
+
+# Resumable upload chunk: a multiple of GCS's 256 KiB upload quantum
+_UPLOAD_CHUNK_SIZE = 32 * 256 * 1024  # 8 MiB
+# Files on disk at least this big are sent as parallel multipart chunks;
+# below it the extra initiate/complete requests outweigh the gain
+_PARALLEL_UPLOAD_THRESHOLD = 32 * 1024 * 1024
+_PARALLEL_UPLOAD_WORKERS = 4
+
+# In-process signed URL cache in front of Redis, keyed by (url, expiration).
+# Entries are (url, reuse_until) so one shared from Redis or signed with a
+# shorter expiration is never handed out too close to expiry.
+_SIGNED_URL_CACHE = TTLCache(maxsize=10_000, ttl=3600 - PRESIGNED_URL_REFRESH_MARGIN)
+
+
+def _signed_url_key(gcs_url: str, expiration: int) -> str:
+    """Redis key for a cached (signed_url, reuse_until) entry."""
+    return f"signed_url:v2:{expiration}:{gcs_url}"
+
 
 class GCSStorageService:
     """Manage medical scan images in GCS."""
@@ -23,12 +51,24 @@ class GCSStorageService:
         self._bucket = None
         self.project_id = None
         self.bucket_name = None
+        self._init_lock = threading.Lock()
     
     def _initialize(self):
         """Lazy initialization - only when first used."""
         if self._client is not None:
             return
-        
+        with self._init_lock:
+            if self._client is None:
+                self._create_client()
+    
+    async def _initialize_async(self):
+        """_initialize for async callers, run in a thread on first use."""
+        # Loading credentials (key file or metadata server) blocks
+        if self._client is None:
+            await asyncio.to_thread(self._initialize)
+    
+    def _create_client(self):
+        """Build the client and bucket handle (call via _initialize)."""
         # Load from config (which reads .env)
         from app.core.config import settings
         
@@ -39,9 +79,10 @@ class GCSStorageService:
         if settings.GOOGLE_APPLICATION_CREDENTIALS:
             os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = settings.GOOGLE_APPLICATION_CREDENTIALS
         
-        # Initialize GCS client
-        self._client = storage.Client(project=self.project_id)
-        self._bucket = self._client.bucket(self.bucket_name)
+        # Initialize GCS client (bucket first: _client set means ready)
+        client = storage.Client(project=self.project_id)
+        self._bucket = client.bucket(self.bucket_name)
+        self._client = client
         
         logger.info(f"GCS Storage initialized: gs://{self.bucket_name}")
     
@@ -59,11 +100,13 @@ class GCSStorageService:
     
     def upload_scan_image(
         self,
-        file_data: BytesIO,
+        file_data: BinaryIO,
         patient_id: str,
         scan_id: str,
         filename: str,
-        content_type: str = 'image/jpeg'
+        content_type: str = 'image/jpeg',
+        metadata: Optional[dict] = None,
+        size: Optional[int] = None
     ) -> str:
         """
         Upload scan image to platform storage (temporary storage for web portal).
@@ -72,20 +115,51 @@ class GCSStorageService:
         Purpose: Web portal display, temporary until synced to MLOps
         
         Args:
-            file_data: Image file data
+            file_data: Seekable binary file (BytesIO, open file, spooled
+                upload); read in chunks, never copied whole into memory.
+                Large files opened from disk upload in parallel chunks.
             patient_id: Patient ID (e.g., PT-001)
             scan_id: Scan ID (UUID)
             filename: Filename (e.g., original.jpg, gradcam.jpg)
             content_type: MIME type
+            metadata: Custom object metadata, sent with the upload itself
+            size: Byte length if already known (else measured by seeking)
             
         Returns:
             GCS URL (gs://bucket/path)
         """
         gcs_path = f"platform/raw_scans/patients/{patient_id}/{scan_id}/{filename}"
         
-        blob = self.bucket.blob(gcs_path)
-        file_data.seek(0)
-        blob.upload_from_file(file_data, content_type=content_type)
+        # Larger objects use a resumable session sent chunk by chunk, each
+        # retried on its own
+        blob = self.bucket.blob(gcs_path, chunk_size=_UPLOAD_CHUNK_SIZE)
+        if metadata:
+            blob.metadata = metadata
+        if size is None:
+            size = file_data.seek(0, os.SEEK_END)
+        
+        path = getattr(file_data, 'name', None)
+        if size >= _PARALLEL_UPLOAD_THRESHOLD and isinstance(path, str) and os.path.isfile(path):
+            # XML multipart upload: chunks go up concurrently on separate
+            # connections and are assembled server-side (no temp objects)
+            transfer_manager.upload_chunks_concurrently(
+                path,
+                blob,
+                content_type=content_type,
+                chunk_size=_UPLOAD_CHUNK_SIZE,
+                worker_type=transfer_manager.THREAD,
+                max_workers=_PARALLEL_UPLOAD_WORKERS
+            )
+        else:
+            file_data.seek(0)
+            # With the size known, objects under 8 MB go up as a single multipart
+            # request (data + metadata) instead of a resumable session
+            blob.upload_from_file(
+                file_data,
+                size=size,
+                content_type=content_type,
+                checksum="crc32c"
+            )
         
         url = f"gs://{self.bucket_name}/{gcs_path}"
         logger.info(f"Uploaded to platform: {url}")
@@ -201,6 +275,96 @@ class GCSStorageService:
         
         return signed_url
     
+    async def get_signed_url_async(
+        self,
+        gcs_url: str,
+        expiration: int = 3600
+    ) -> str:
+        """Async get_signed_url with caching (see get_signed_urls)."""
+        return (await self.get_signed_urls([gcs_url], expiration))[0]
+    
+    async def get_signed_urls(
+        self,
+        gcs_urls: List[str],
+        expiration: int = 3600
+    ) -> List[str]:
+        """
+        Sign several URLs, preserving input order.
+        
+        Results are cached (in-process, then Redis if configured) until
+        shortly before they expire. Redis misses are looked up with one
+        MGET, the rest are signed concurrently in worker threads, and
+        repeated paths within one call are signed once.
+        """
+        if not gcs_urls:
+            return []
+        
+        from app.core.cache import cache_get_many, cache_set_many
+        
+        now = time.time()
+        signed = {}
+        misses = []
+        for url in dict.fromkeys(gcs_urls):
+            cached = _SIGNED_URL_CACHE.get((url, expiration))
+            if cached is not None and cached[1] > now:
+                signed[url] = cached[0]
+            else:
+                misses.append(url)
+        
+        if misses:
+            to_sign = []
+            remote = await cache_get_many([_signed_url_key(url, expiration) for url in misses])
+            for url, cached in zip(misses, remote):
+                if cached is not None and cached[1] > now:
+                    _SIGNED_URL_CACHE[(url, expiration)] = tuple(cached)
+                    signed[url] = cached[0]
+                else:
+                    to_sign.append(url)
+            
+            if to_sign:
+                # Initialize once up front so worker threads don't race on it
+                await self._initialize_async()
+                fresh = await asyncio.gather(
+                    *(asyncio.to_thread(self.get_signed_url, url, expiration) for url in to_sign)
+                )
+                signed.update(zip(to_sign, fresh))
+                
+                # Reuse until shortly before the URL itself expires
+                ttl = expiration - PRESIGNED_URL_REFRESH_MARGIN
+                if ttl > 0:
+                    entries = {}
+                    for url, signed_url in zip(to_sign, fresh):
+                        entry = (signed_url, now + ttl)
+                        _SIGNED_URL_CACHE[(url, expiration)] = entry
+                        entries[_signed_url_key(url, expiration)] = entry
+                    await cache_set_many(entries, ttl)
+        
+        return [signed[url] for url in gcs_urls]
+    
+    def presign(self, gcs_url: str) -> Tuple[str, datetime]:
+        """Generate a long-lived signed URL to store alongside the image row."""
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=PRESIGNED_URL_TTL)
+        return self.get_signed_url(gcs_url, expiration=PRESIGNED_URL_TTL), expires_at
+    
+    async def resolve_image_urls(self, images) -> Tuple[List[str], List[str]]:
+        """
+        Pick a URL for each scan_images row (mappings, see load_json_images).
+        
+        Rows with a stored pre-signed URL that is not about to expire use it
+        as-is; the rest are signed now. Returns (urls, stale_image_paths) so
+        the caller can refresh the stale rows in the background.
+        """
+        cutoff = datetime.now(timezone.utc) + timedelta(seconds=PRESIGNED_URL_REFRESH_MARGIN)
+        stale = [
+            img["image_path"] for img in images
+            if not img["signed_url"] or not img["signed_url_expires_at"]
+            or img["signed_url_expires_at"] < cutoff
+        ]
+        fresh_urls = dict(zip(stale, await self.get_signed_urls(stale, expiration=3600)))
+        
+        urls = [fresh_urls.get(img["image_path"]) or img["signed_url"] for img in images]
+        return urls, stale
+    
     def download_image(self, gcs_url: str) -> BytesIO:
         """
         Download image from GCS.
@@ -221,14 +385,12 @@ class GCSStorageService:
         
         blob = self.bucket.blob(gcs_path)
         
-        if not blob.exists():
+        # A missing object surfaces from the download itself; no separate
+        # exists() metadata request ahead of the model call
+        try:
+            return BytesIO(blob.download_as_bytes())
+        except NotFound:
             raise NotFound(f"Image not found: {gcs_url}")
-        
-        image_data = BytesIO()
-        blob.download_to_file(image_data)
-        image_data.seek(0)
-        
-        return image_data
     
     def delete_image(self, gcs_url: str) -> bool:
         """Delete image from GCS."""
@@ -268,4 +430,41 @@ class GCSStorageService:
 
 
 # Singleton instance
-gcs_storage = GCSStorageService()
\ No newline at end of file
+gcs_storage = GCSStorageService()
+
+
+def load_json_images(images) -> List[dict]:
+    """
+    Decode a json_agg'd scan_images column into dicts.
+    
+    asyncpg hands json back as text while psycopg2 decodes it; timestamps
+    inside json are always ISO strings.
+    """
+    if isinstance(images, (str, bytes)):
+        images = orjson.loads(images)
+    for img in images or []:
+        if isinstance(img.get("signed_url_expires_at"), str):
+            img["signed_url_expires_at"] = datetime.fromisoformat(img["signed_url_expires_at"])
+    return images or []
+
+
+async def refresh_presigned_urls(image_paths: List[str]) -> None:
+    """Re-sign images and store the new URLs on scan_images (background task)."""
+    from sqlalchemy import text
+    from app.core.database import AsyncSessionLocal
+    
+    try:
+        await gcs_storage._initialize_async()
+        signed = await asyncio.gather(
+            *(asyncio.to_thread(gcs_storage.presign, path) for path in image_paths)
+        )
+        async with AsyncSessionLocal() as db:
+            for path, (url, expires_at) in zip(image_paths, signed):
+                await db.execute(text("""
+                    UPDATE scan_images
+                    SET signed_url = :url, signed_url_expires_at = :expires_at
+                    WHERE image_path = :path
+                """), {"url": url, "expires_at": expires_at, "path": path})
+            await db.commit()
+    except Exception as e:
+        logger.error(f"Failed to refresh pre-signed URLs: {e}")
@@ -3,15 +3,47 @@ ML Model Service - Calls Actual GCP Vision Inference API
 Endpoints loaded from config
 """
 import requests
+from requests.adapters import HTTPAdapter
 import base64
 from io import BytesIO
 from typing import Dict, Tuple
 import logging
 
+import orjson
+
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# One keep-alive session for the model endpoints: each analysis reuses a
+# pooled TLS connection instead of handshaking with Cloud Run per call.
+# Pool sized for the concurrent in-process analyses.
+_http = requests.Session()
+_http.mount("https://", HTTPAdapter(pool_connections=2, pool_maxsize=settings.ML_ANALYSIS_WORKERS))
+_http.headers.update({'accept': 'application/json'})
+
+# (connect, read) seconds: an unreachable endpoint fails fast, while a
+# cold-starting model still gets a minute to answer
+_TIMEOUT = (5, 60)
+
+
+def _parse_model_response(response: requests.Response) -> Tuple[Dict, BytesIO]:
+    """Prediction and decoded GradCAM from one model endpoint response."""
+    result = orjson.loads(response.content)
+    
+    prediction = {
+        "predicted_class": result.get("predicted_class", "Unknown"),
+        "confidence": result.get("confidence", 0.0),
+        "class_probabilities": result.get("class_probabilities", {})
+    }
+    
+    # The endpoint returns the GradCAM overlay from the same forward pass
+    gradcam_image = None
+    if 'gradcam_image' in result:
+        gradcam_image = BytesIO(base64.b64decode(result['gradcam_image']))
+    
+    return prediction, gradcam_image
+
 
 class MLModelService:
     """Service to call actual ML model endpoints."""
@@ -33,35 +65,19 @@ class MLModelService:
             # Prepare file for upload
             image_data.seek(0)
             files = {'file': ('scan.jpg', image_data, 'image/jpeg')}
-            headers = {'accept': 'application/json'}
             
             # Call endpoint
-            response = requests.post(
+            response = _http.post(
                 settings.TB_MODEL_ENDPOINT,
-                headers=headers,
                 files=files,
-                timeout=60  # 1 minute timeout
+                timeout=_TIMEOUT
             )
             
             if response.status_code != 200:
                 logger.error(f"TB model API error: {response.status_code} - {response.text}")
                 raise Exception(f"Model API returned {response.status_code}")
             
-            result = response.json()
-            
-            # Extract prediction
-            prediction = {
-                "predicted_class": result.get("predicted_class", "Unknown"),
-                "confidence": result.get("confidence", 0.0),
-                "class_probabilities": result.get("class_probabilities", {})
-            }
-            
-            # Decode GradCAM image
-            gradcam_image = None
-            if 'gradcam_image' in result:
-                gradcam_base64 = result['gradcam_image']
-                gradcam_bytes = base64.b64decode(gradcam_base64)
-                gradcam_image = BytesIO(gradcam_bytes)
+            prediction, gradcam_image = _parse_model_response(response)
             
             logger.info(f" TB model prediction: {prediction['predicted_class']} ({prediction['confidence']:.2%})")
             
@@ -91,14 +107,12 @@ class MLModelService:
             # Prepare file
             image_data.seek(0)
             files = {'file': ('scan.jpg', image_data, 'image/jpeg')}
-            headers = {'accept': 'application/json'}
             
             # Call endpoint (TODO: Update URL when lung cancer endpoint is ready)
-            response = requests.post(
+            response = _http.post(
                 settings.LUNG_CANCER_MODEL_ENDPOINT,
-                headers=headers,
                 files=files,
-                timeout=60
+                timeout=_TIMEOUT
             )
             
             if response.status_code != 200:
@@ -107,20 +121,7 @@ class MLModelService:
                 logger.warning("Lung Cancer endpoint not ready, using mock data")
                 return MLModelService._mock_lung_cancer_prediction()
             
-            result = response.json()
-            
-            prediction = {
-                "predicted_class": result.get("predicted_class", "Unknown"),
-                "confidence": result.get("confidence", 0.0),
-                "class_probabilities": result.get("class_probabilities", {})
-            }
-            
-            # Decode GradCAM
-            gradcam_image = None
-            if 'gradcam_image' in result:
-                gradcam_base64 = result['gradcam_image']
-                gradcam_bytes = base64.b64decode(gradcam_base64)
-                gradcam_image = BytesIO(gradcam_bytes)
+            prediction, gradcam_image = _parse_model_response(response)
             
             logger.info(f" LC model prediction: {prediction['predicted_class']} ({prediction['confidence']:.2%})")
             
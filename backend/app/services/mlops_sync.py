@@ -1,6 +1,12 @@
 """
 MLOps Sync Service - Real-Time Sync
 Syncs diagnosed scans to proper class folders for data pipeline compatibility
+
+Filter order: reject on cheap predicates first (diagnosis, exam type/body
+region, status, dates - in Python on values already in hand, or in the SQL
+WHERE clause), and only then load images, copy blobs or run any model
+re-scoring over the reduced set. Never select every scan and filter it with
+an ML/LLM call per row.
 """
 import logging
 from datetime import datetime
@@ -9,7 +15,7 @@ import pandas as pd
 import os
 import random
 
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, raiseload
 from sqlalchemy import text
 
 from app.models.scan import Scan
@@ -126,7 +132,7 @@ class DiagnosisMappingService:
 def sync_scan_to_mlops(
     scan_id: str,
     diagnosis: str,
-    db: Session
+    db: Optional[Session] = None
 ) -> Dict[str, any]:
     """
     Sync a single scan to MLOps pipeline with proper class folder structure.
@@ -142,20 +148,39 @@ def sync_scan_to_mlops(
     Args:
         scan_id: Scan UUID
         diagnosis: Radiologist diagnosis (from radiologist_feedback.radiologist_diagnosis)
-        db: Database session
+        db: Database session. Omit it when running as a background task;
+            a session of its own is opened and closed here instead.
         
     Returns:
         Result dictionary with 'success', 'message', 'paths'
     """
+    if db is None:
+        from app.core.database import SessionLocal
+        db = SessionLocal()
+        try:
+            return sync_scan_to_mlops(scan_id, diagnosis, db)
+        finally:
+            db.close()
+    
+    # The diagnosis alone rules out most non-trainable feedback; skip the DB
+    if not any(DiagnosisMappingService.is_trainable(diagnosis, t) for t in ('tb', 'lung_cancer')):
+        logger.info(f"Skipping sync for scan {scan_id}: diagnosis='{diagnosis}' (not trainable)")
+        return {
+            'success': False,
+            'message': f'Diagnosis "{diagnosis}" not suitable for training',
+            'synced': False
+        }
+    
     try:
         # Get scan to determine exam type
-        scan = db.query(Scan).filter(Scan.id == scan_id).first()
+        scan = db.query(Scan).options(raiseload('*')).filter(Scan.id == scan_id).first()
         if not scan:
             return {'success': False, 'message': 'Scan not found'}
         
         # Determine dataset type from examination_type + body_region
-        exam_type = str(scan.examination_type).lower()
-        body_region = str(scan.body_region).lower()
+        # (enum members; str() would give "ExaminationType.xray")
+        exam_type = getattr(scan.examination_type, 'value', str(scan.examination_type)).lower()
+        body_region = getattr(scan.body_region, 'value', str(scan.body_region)).lower()
         
         if exam_type == 'xray' and body_region == 'chest':
             dataset_type = 'tb'
@@ -185,7 +210,7 @@ def sync_scan_to_mlops(
             }
         
         # Get patient
-        patient = db.query(PatientProfile).filter(
+        patient = db.query(PatientProfile).options(raiseload('*')).filter(
             PatientProfile.id == scan.patient_id
         ).first()
         
@@ -197,6 +222,8 @@ def sync_scan_to_mlops(
             SELECT predicted_class 
             FROM ai_predictions 
             WHERE scan_id = :scan_id
+            ORDER BY inference_timestamp DESC
+            LIMIT 1
         """), {"scan_id": str(scan_id)})
         
         ai_row = ai_prediction_result.fetchone()
@@ -216,7 +243,7 @@ def sync_scan_to_mlops(
             }
         
         # Get images
-        scan_images = db.query(ScanImage).filter(
+        scan_images = db.query(ScanImage).options(raiseload('*')).filter(
             ScanImage.scan_id == scan.id
         ).all()
         
@@ -325,7 +352,7 @@ def generate_metadata_csv(
     
     for scan in scans:
         # Get patient profile
-        patient = db.query(PatientProfile).filter(
+        patient = db.query(PatientProfile).options(raiseload('*')).filter(
             PatientProfile.id == scan.patient_id
         ).first()
         
@@ -335,7 +362,7 @@ def generate_metadata_csv(
         ).first()
         
         # Get synced images (only those with gcs_path populated)
-        scan_images = db.query(ScanImage).filter(
+        scan_images = db.query(ScanImage).options(raiseload('*')).filter(
             ScanImage.scan_id == scan.id,
             ScanImage.gcs_path.isnot(None)  # Only synced images
         ).all()
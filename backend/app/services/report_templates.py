@@ -3,21 +3,28 @@ Report Templates Module
 Generates clear, focused diagnostic reports for patients
 """
 from datetime import datetime
-from typing import Dict
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Mapping
 from app.models.scan import Scan
 
 
+EXAM_TYPE_DISPLAY = {
+    'xray': 'X-ray', 
+    'ct': 'CT', 
+    'mri': 'MRI', 
+    'pet': 'PET', 
+    'ultrasound': 'Ultrasound'
+}
+_CAPFIELDS = frozenset({'body_region', 'urgency_level'})
+
+
+@lru_cache(maxsize=64)
 def capitalize_for_display(value: str, field_type: str) -> str:
     """Capitalize lowercase enum values for UI display."""
     if field_type == 'examination_type':
-        return {
-            'xray': 'X-ray', 
-            'ct': 'CT', 
-            'mri': 'MRI', 
-            'pet': 'PET', 
-            'ultrasound': 'Ultrasound'
-        }.get(value, value)
-    elif field_type in ['body_region', 'urgency_level']:
+        return EXAM_TYPE_DISPLAY.get(value, value)
+    if field_type in _CAPFIELDS:
         return value.capitalize()
     return value
 
@@ -27,11 +34,27 @@ def generate_report_template(
     predicted_class: str, 
     confidence: float, 
     radiologist_name: str
-) -> Dict[str, str]:
-    """Generate patient-focused diagnostic report."""
+) -> Mapping[str, str]:
+    """Generate patient-focused diagnostic report.
     
-    exam_display = capitalize_for_display(scan.examination_type.value, 'examination_type')
-    diagnosis_lower = predicted_class.lower()
+    `scan` may be a Scan or any row exposing examination_type (enum or raw value).
+    The text depends only on exam type and diagnosis, so the (read-only)
+    result is shared between calls.
+    """
+    
+    exam_type = getattr(scan.examination_type, 'value', scan.examination_type)
+    return _cached_template(exam_type, predicted_class.lower())
+
+
+@lru_cache(maxsize=64)
+def _cached_template(exam_type: str, diagnosis_lower: str) -> Mapping[str, str]:
+    """Template for one (exam type, diagnosis) pair."""
+    return MappingProxyType(_build_template(exam_type, diagnosis_lower))
+
+
+def _build_template(exam_type: str, diagnosis_lower: str) -> Dict[str, str]:
+    """Pick the report generator for a diagnosis."""
+    exam_display = capitalize_for_display(exam_type, 'examination_type')
     
     if diagnosis_lower == "tuberculosis":
         return generate_tuberculosis_report(exam_display)
@@ -0,0 +1,51 @@
+"""
+Celery worker for AI analysis and MLOps sync jobs
+
+Optional: only used when CELERY_BROKER_URL is configured; otherwise the
+API runs analyses and MLOps syncs in-process. Each job type has its own
+queue so the two pools scale separately:
+    celery -A app.worker worker -Q ai_analysis
+    celery -A app.worker worker -Q mlops_sync --concurrency=2
+
+Both jobs spend nearly all their time waiting on GCS and the model
+endpoints, so workers run a thread pool: one process keeps
+ML_ANALYSIS_WORKERS requests in flight instead of one per process.
+"""
+import logging
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+celery_app = None
+
+if settings.CELERY_BROKER_URL:
+    from celery import Celery
+    
+    celery_app = Celery("medscan", broker=settings.CELERY_BROKER_URL)
+    celery_app.conf.update(
+        task_serializer="json",
+        accept_content=["json"],
+        # Analyses are long; hand out one at a time and only ack once done
+        # so a crashed worker's job is redelivered
+        task_acks_late=True,
+        worker_prefetch_multiplier=1,
+        worker_pool="threads",
+        worker_concurrency=settings.ML_ANALYSIS_WORKERS,
+        task_routes={
+            "run_ai_analysis_workflow": {"queue": "ai_analysis"},
+            "sync_scan_to_mlops": {"queue": "mlops_sync"},
+        },
+    )
+    
+    @celery_app.task(name="run_ai_analysis_workflow")
+    def run_ai_analysis(scan_id: str, model_type: str):
+        """Run one scan through the ML model (see run_ai_analysis_workflow)."""
+        from app.api.radiologist import run_ai_analysis_workflow
+        run_ai_analysis_workflow(scan_id, model_type)
+    
+    @celery_app.task(name="sync_scan_to_mlops")
+    def sync_scan(scan_id: str, diagnosis: str):
+        """Copy a diagnosed scan into the MLOps dataset (see sync_scan_to_mlops)."""
+        from app.services.mlops_sync import sync_scan_to_mlops
+        sync_scan_to_mlops(scan_id, diagnosis)
@@ -1,12 +1,25 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
+from app.core.database import pool_stats
 from app.api import auth, patient, radiologist, rag
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Close pooled outbound connections on shutdown
+    await rag.close_rag_client()
+
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.VERSION,
-    description="MedScanAI - AI-Assisted Medical Imaging System"
+    description="MedScanAI - AI-Assisted Medical Imaging System",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # CORS Configuration
@@ -34,7 +47,9 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
+    # Pool saturation (checked_out near size + max overflow) shows up here
+    # before requests start timing out on pool_timeout
+    return {"status": "healthy", "db_pool": pool_stats()}
 
 if __name__ == "__main__":
     import uvicorn
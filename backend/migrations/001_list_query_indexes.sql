@@ -0,0 +1,18 @@
+-- Composite indexes matching the patient list queries
+-- (filter on patient/scan, order by date) so Postgres can skip the sort.
+--
+-- CREATE INDEX CONCURRENTLY cannot run inside a transaction block;
+-- run this file with autocommit, e.g.  psql "$DATABASE_URL" -f 001_list_query_indexes.sql
+--
+-- patient_profiles.user_id is already UNIQUE, which gives it a unique
+-- index, so the profile lookup needs nothing new.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_scans_patient_scan_date
+ON scans(patient_id, scan_date DESC);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_reports_scan_published
+ON reports(scan_id, published_at DESC)
+WHERE report_status = 'published';
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_scan_images_scan_order
+ON scan_images(scan_id, image_order);
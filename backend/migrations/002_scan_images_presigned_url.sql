@@ -0,0 +1,7 @@
+-- Store a pre-signed read URL per image so scan detail views don't have
+-- to sign on every request. Filled at upload time and refreshed in the
+-- background when it gets close to expiry.
+
+ALTER TABLE scan_images
+ADD COLUMN IF NOT EXISTS signed_url TEXT,
+ADD COLUMN IF NOT EXISTS signed_url_expires_at TIMESTAMP WITH TIME ZONE;
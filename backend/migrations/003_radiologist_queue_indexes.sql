@@ -0,0 +1,22 @@
+-- Partial indexes for the radiologist worklists and the
+-- "latest prediction for a scan" lookups.
+--
+-- CREATE INDEX CONCURRENTLY cannot run inside a transaction block;
+-- run this file with autocommit, e.g.  psql "$DATABASE_URL" -f 003_radiologist_queue_indexes.sql
+--
+-- The pending list orders by a CASE over urgency_level, which no index
+-- can satisfy directly, but the partial index keeps the scan down to
+-- open scans only instead of the whole table.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_scans_pending_urg_created
+ON scans(urgency_level, created_at DESC)
+WHERE status IN ('pending', 'in_progress', 'ai_analyzed');
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_scans_completed_review
+ON scans(radiologist_review_completed_at DESC)
+WHERE status = 'completed';
+
+-- ORDER BY inference_timestamp DESC LIMIT 1 per scan
+-- (ai-results, draft report) becomes a single index probe.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_ai_predictions_scan_ts
+ON ai_predictions(scan_id, inference_timestamp DESC);
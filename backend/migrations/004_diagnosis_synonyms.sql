@@ -0,0 +1,30 @@
+-- Lookup table used by the AI analysis workflow to normalize model labels
+-- in the ai_predictions INSERT itself. Unknown labels fall back to
+-- 'other_abnormality'. New synonyms can be added here without a redeploy;
+-- keep _DIAGNOSIS_MAP in app/api/radiologist.py (radiologist feedback)
+-- in step.
+
+CREATE TABLE IF NOT EXISTS diagnosis_synonyms (
+    raw TEXT PRIMARY KEY,
+    canonical TEXT NOT NULL
+);
+
+INSERT INTO diagnosis_synonyms (raw, canonical) VALUES
+    ('normal', 'normal'),
+    ('no finding', 'normal'),
+    ('negative', 'normal'),
+    ('tuberculosis', 'tuberculosis'),
+    ('tb', 'tuberculosis'),
+    ('positive', 'tuberculosis'),
+    ('adenocarcinoma', 'lung_cancer'),
+    ('squamous_cell_carcinoma', 'lung_cancer'),
+    ('squamous_cell', 'lung_cancer'),
+    ('large_cell_carcinoma', 'lung_cancer'),
+    ('large_cell', 'lung_cancer'),
+    ('lung_cancer', 'lung_cancer'),
+    ('malignant', 'lung_cancer'),
+    ('benign', 'lung_cancer'),
+    ('inconclusive', 'inconclusive'),
+    ('uncertain', 'inconclusive'),
+    ('unknown', 'inconclusive')
+ON CONFLICT (raw) DO NOTHING;
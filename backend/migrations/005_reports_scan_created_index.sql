@@ -0,0 +1,8 @@
+-- Latest report per scan (completed worklist LATERAL lookup, draft report)
+-- becomes a single index probe.
+--
+-- CREATE INDEX CONCURRENTLY cannot run inside a transaction block;
+-- run this file with autocommit, e.g.  psql "$DATABASE_URL" -f 005_reports_scan_created_index.sql
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_reports_scan_created
+ON reports(scan_id, created_at DESC);
@@ -0,0 +1,15 @@
+-- Replace the pending worklist index with one on the exact urgency rank
+-- expression the query orders by, so ORDER BY ... LIMIT is read straight
+-- off the index with no sort step.
+--
+-- The CASE must stay identical to the ORDER BY in _URGENCY_RANK
+-- (app/api/radiologist.py) or the planner won't match it.
+--
+-- CREATE/DROP INDEX CONCURRENTLY cannot run inside a transaction block;
+-- run this file with autocommit, e.g.  psql "$DATABASE_URL" -f 006_pending_queue_rank_index.sql
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_scans_pending_queue
+ON scans ((CASE urgency_level WHEN 'emergent' THEN 1 WHEN 'urgent' THEN 2 ELSE 3 END), created_at DESC)
+WHERE status IN ('pending', 'in_progress', 'ai_analyzed');
+
+DROP INDEX CONCURRENTLY IF EXISTS idx_scans_pending_urg_created;
@@ -0,0 +1,21 @@
+-- Store the worklist urgency rank as a generated column and index it, in
+-- place of the CASE expression index from 006. The pending queue orders by
+-- (urgency_rank, created_at DESC, id DESC); with all three in a plain
+-- column index the planner reads the first page off the index with no
+-- sort node, and keyset pages resume from the cursor with an index seek.
+--
+-- ADD COLUMN ... STORED rewrites scans under an ACCESS EXCLUSIVE lock;
+-- run it in a quiet window. Apply before deploying the API that reads
+-- scans.urgency_rank.
+--
+-- CREATE/DROP INDEX CONCURRENTLY cannot run inside a transaction block;
+-- run this file with autocommit, e.g.  psql "$DATABASE_URL" -f 007_scans_urgency_rank_column.sql
+
+ALTER TABLE scans ADD COLUMN IF NOT EXISTS urgency_rank SMALLINT
+GENERATED ALWAYS AS (CASE urgency_level WHEN 'emergent' THEN 1 WHEN 'urgent' THEN 2 ELSE 3 END) STORED;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_scans_pending_rank
+ON scans (urgency_rank, created_at DESC, id DESC)
+WHERE status IN ('pending', 'in_progress', 'ai_analyzed');
+
+DROP INDEX CONCURRENTLY IF EXISTS idx_scans_pending_queue;
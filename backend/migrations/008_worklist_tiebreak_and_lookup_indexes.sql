@@ -0,0 +1,33 @@
+-- Remaining ORDER BY / lookup paths on the radiologist API:
+--
+-- * Completed worklist: keyset pages order by
+--   (radiologist_review_completed_at DESC, id DESC); carry id in the
+--   partial index so ties are read in order too (replaces the 003 index).
+-- * AI results: latest gradcam_outputs row per prediction.
+-- * Disagreement alert: overrides in the last N hours, counted on every
+--   override feedback.
+--
+-- The single-column scan_id indexes below are prefixes of the composite
+-- (scan_id, ...) indexes from 001/003/005 and only add write cost.
+--
+-- CREATE/DROP INDEX CONCURRENTLY cannot run inside a transaction block;
+-- run this file with autocommit, e.g.  psql "$DATABASE_URL" -f 008_worklist_tiebreak_and_lookup_indexes.sql
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_scans_completed_review_id
+ON scans(radiologist_review_completed_at DESC, id DESC)
+WHERE status = 'completed';
+
+DROP INDEX CONCURRENTLY IF EXISTS idx_scans_completed_review;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_gradcam_outputs_prediction_created
+ON gradcam_outputs(ai_prediction_id, created_at DESC);
+
+DROP INDEX CONCURRENTLY IF EXISTS idx_gradcam_outputs_prediction_id;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_radiologist_feedback_overrides
+ON radiologist_feedback(feedback_timestamp DESC)
+WHERE feedback_type IN ('partial_override', 'full_override');
+
+DROP INDEX CONCURRENTLY IF EXISTS idx_ai_predictions_scan_id;
+DROP INDEX CONCURRENTLY IF EXISTS idx_reports_scan_id;
+DROP INDEX CONCURRENTLY IF EXISTS idx_scan_images_scan_id;
@@ -0,0 +1,17 @@
+-- Store users' display name as a generated column so list/detail queries
+-- select u.full_name instead of concatenating first/last name per row,
+-- and cover it in an index keyed on id: the patient-name join from the
+-- worklists becomes an index-only lookup.
+--
+-- ADD COLUMN ... STORED rewrites users under an ACCESS EXCLUSIVE lock;
+-- run it in a quiet window. Apply before deploying the API that reads
+-- users.full_name.
+--
+-- CREATE INDEX CONCURRENTLY cannot run inside a transaction block;
+-- run this file with autocommit, e.g.  psql "$DATABASE_URL" -f 009_users_full_name.sql
+
+ALTER TABLE users ADD COLUMN IF NOT EXISTS full_name TEXT
+GENERATED ALWAYS AS (first_name || ' ' || last_name) STORED;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_users_id_full_name
+ON users(id) INCLUDE (full_name);
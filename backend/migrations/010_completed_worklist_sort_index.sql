@@ -0,0 +1,14 @@
+-- Completed worklist keyset pages now order by
+-- (COALESCE(radiologist_review_completed_at, created_at) DESC, id DESC):
+-- radiologist_review_completed_at is nullable, and a NULL sort key sorted
+-- first under DESC and could not be carried in a page cursor. Index the
+-- same expression (replaces the 008 index).
+--
+-- CREATE/DROP INDEX CONCURRENTLY cannot run inside a transaction block;
+-- run this file with autocommit, e.g.  psql "$DATABASE_URL" -f 010_completed_worklist_sort_index.sql
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_scans_completed_sort
+ON scans((COALESCE(radiologist_review_completed_at, created_at)) DESC, id DESC)
+WHERE status = 'completed';
+
+DROP INDEX CONCURRENTLY IF EXISTS idx_scans_completed_review_id;
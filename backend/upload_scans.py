@@ -7,7 +7,6 @@ from pathlib import Path
 import random
 from datetime import datetime, timedelta
 import uuid
-from io import BytesIO
 
 from dotenv import load_dotenv
 load_dotenv()
@@ -38,6 +37,40 @@ SYMPTOMS = [
 MEDICATIONS = [["None"], ["Albuterol"], ["Isoniazid"]]
 SURGERIES = [["None"], ["Appendectomy"]]
 
+# Scan row and its image row in one round trip
+_INSERT_SCAN_WITH_IMAGE_SQL = text("""
+    WITH s AS (
+        INSERT INTO scans (
+            id, patient_id, scan_number, 
+            examination_type, body_region, urgency_level, status,
+            presenting_symptoms, current_medications, previous_surgeries,
+            scan_date, clinical_notes, imaging_facility,
+            created_at, updated_at
+        ) VALUES (
+            :id, :patient_id, :scan_number,
+            :exam_type, :body_region, :urgency, :status,
+            :symptoms, :medications, :surgeries,
+            :scan_date, :notes, :facility,
+            NOW(), NOW()
+        )
+        RETURNING id
+    )
+    INSERT INTO scan_images (
+        scan_id, image_path, image_url, 
+        file_size_bytes, image_format, image_order,
+        signed_url, signed_url_expires_at
+    )
+    SELECT s.id, :path, :url, :size, :format, :order,
+           :signed_url, :signed_url_expires_at
+    FROM s
+""")
+
+_SCANS_PER_PATIENT_SQL = text("""
+    SELECT patient_id, COUNT(*) FROM scans
+    WHERE patient_id = ANY(CAST(:pids AS uuid[]))
+    GROUP BY patient_id
+""")
+
 
 def find_images(directory: str) -> list:
     dir_path = Path(directory).expanduser()
@@ -119,22 +152,22 @@ def upload_scans(image_dir: str = './scans/'):
                     
                     scan_date = datetime.utcnow() - timedelta(days=random.randint(0, 20))
                     
-                    # Insert with ALL LOWERCASE enum values
-                    db.execute(text("""
-                        INSERT INTO scans (
-                            id, patient_id, scan_number, 
-                            examination_type, body_region, urgency_level, status,
-                            presenting_symptoms, current_medications, previous_surgeries,
-                            scan_date, clinical_notes, imaging_facility,
-                            created_at, updated_at
-                        ) VALUES (
-                            :id, :patient_id, :scan_number,
-                            :exam_type, :body_region, :urgency, :status,
-                            :symptoms, :medications, :surgeries,
-                            :scan_date, :notes, :facility,
-                            NOW(), NOW()
+                    # Upload to GCS, streamed from disk
+                    file_size = img.stat().st_size
+                    with open(img, 'rb') as f:
+                        gcs_url = gcs_storage.upload_scan_image(
+                            file_data=f,
+                            patient_id=patient.patient_id,
+                            scan_id=scan_id,
+                            filename="original.jpg",
+                            size=file_size
                         )
-                    """), {
+                    
+                    # Pre-sign now so reads don't have to
+                    signed_url, signed_url_expires_at = gcs_storage.presign(gcs_url)
+                    
+                    # Insert scan + image with ALL LOWERCASE enum values
+                    db.execute(_INSERT_SCAN_WITH_IMAGE_SQL, {
                         'id': scan_id,
                         'patient_id': str(patient.id),
                         'scan_number': scan_number,
@@ -147,33 +180,14 @@ def upload_scans(image_dir: str = './scans/'):
                         'surgeries': random.choice(SURGERIES),
                         'scan_date': scan_date,
                         'notes': f"{exam_type} for {model_type} evaluation.",
-                        'facility': 'Massachusetts General Hospital'
-                    })
-                    
-                    # Upload to GCS
-                    with open(img, 'rb') as f:
-                        gcs_url = gcs_storage.upload_scan_image(
-                            file_data=BytesIO(f.read()),
-                            patient_id=patient.patient_id,
-                            scan_id=scan_id,
-                            filename="original.jpg"
-                        )
-                    
-                    # Insert image
-                    db.execute(text("""
-                        INSERT INTO scan_images (
-                            scan_id, image_path, image_url, 
-                            file_size_bytes, image_format, image_order
-                        ) VALUES (
-                            :scan_id, :path, :url, :size, :format, :order
-                        )
-                    """), {
-                        'scan_id': scan_id,
+                        'facility': 'Massachusetts General Hospital',
                         'path': gcs_url,
                         'url': gcs_url,
-                        'size': img.stat().st_size,
+                        'size': file_size,
                         'format': 'jpg',
-                        'order': 1
+                        'order': 1,
+                        'signed_url': signed_url,
+                        'signed_url_expires_at': signed_url_expires_at
                     })
                     
                     db.commit()
@@ -193,11 +207,11 @@ def upload_scans(image_dir: str = './scans/'):
         
         if created > 0:
             print(" By Patient:")
+            counts = dict(db.execute(
+                _SCANS_PER_PATIENT_SQL, {'pids': [str(p.id) for p in patients]}
+            ).fetchall())
             for p in patients:
-                result = db.execute(text("SELECT COUNT(*) FROM scans WHERE patient_id = :pid"),
-                                   {'pid': str(p.id)})
-                count = result.scalar()
-                print(f"   {p.first_name} {p.last_name}: {count}")
+                print(f"   {p.first_name} {p.last_name}: {counts.get(p.id, 0)}")
             
             print(f"\n By Model:")
             print(f"   TB (xray):  {tb_count}")
@@ -17,6 +17,7 @@ CREATE TABLE users (
     status user_status DEFAULT 'active',
     first_name VARCHAR(100) NOT NULL,
     last_name VARCHAR(100) NOT NULL,
+    full_name TEXT GENERATED ALWAYS AS (first_name || ' ' || last_name) STORED,
     phone VARCHAR(20),
     date_of_birth DATE,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
@@ -30,6 +31,7 @@ CREATE TABLE users (
 CREATE INDEX idx_users_email ON users(email);
 CREATE INDEX idx_users_role ON users(role);
 CREATE INDEX idx_users_status ON users(status);
+CREATE INDEX idx_users_id_full_name ON users(id) INCLUDE (full_name);
 
 -- PATIENT PROFILES
 CREATE TYPE gender_type AS ENUM ('Male', 'Female', 'Other', 'Prefer not to say');
@@ -84,6 +86,7 @@ CREATE TABLE scans (
     examination_type examination_type NOT NULL,
     body_region body_region NOT NULL,
     urgency_level urgency_level DEFAULT 'Routine',
+    urgency_rank SMALLINT GENERATED ALWAYS AS (CASE urgency_level WHEN 'emergent' THEN 1 WHEN 'urgent' THEN 2 ELSE 3 END) STORED, -- worklist ordering
     presenting_symptoms TEXT[],
     current_medications TEXT[],
     previous_surgeries TEXT[],
@@ -112,6 +115,9 @@ CREATE INDEX idx_scans_status ON scans(status);
 CREATE INDEX idx_scans_assigned_radiologist ON scans(assigned_radiologist_id);
 CREATE INDEX idx_scans_scan_date ON scans(scan_date DESC);
 CREATE INDEX idx_scans_urgency ON scans(urgency_level);
+CREATE INDEX idx_scans_patient_scan_date ON scans(patient_id, scan_date DESC);
+CREATE INDEX idx_scans_pending_rank ON scans(urgency_rank, created_at DESC, id DESC) WHERE status IN ('pending', 'in_progress', 'ai_analyzed');
+CREATE INDEX idx_scans_completed_sort ON scans((COALESCE(radiologist_review_completed_at, created_at)) DESC, id DESC) WHERE status = 'completed';
 
 -- SCAN IMAGES (Multiple images per scan)
 CREATE TABLE scan_images (
@@ -125,10 +131,12 @@ CREATE TABLE scan_images (
     image_height INTEGER,
     image_format VARCHAR(10),
     dicom_metadata JSONB, -- Store DICOM tags if applicable
+    signed_url TEXT, -- Pre-signed read URL (generated at upload, refreshed on read)
+    signed_url_expires_at TIMESTAMP WITH TIME ZONE,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
 
-CREATE INDEX idx_scan_images_scan_id ON scan_images(scan_id);
+CREATE INDEX idx_scan_images_scan_order ON scan_images(scan_id, image_order);
 
 -- AI PREDICTIONS
 CREATE TYPE prediction_class AS ENUM ('Normal', 'Tuberculosis', 'Lung_Cancer', 'Other_Abnormality');
@@ -159,9 +167,34 @@ CREATE TABLE ai_predictions (
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
 
-CREATE INDEX idx_ai_predictions_scan_id ON ai_predictions(scan_id);
 CREATE INDEX idx_ai_predictions_predicted_class ON ai_predictions(predicted_class);
 CREATE INDEX idx_ai_predictions_confidence ON ai_predictions(confidence_score DESC);
+CREATE INDEX idx_ai_predictions_scan_ts ON ai_predictions(scan_id, inference_timestamp DESC);
+
+-- DIAGNOSIS SYNONYMS (raw model / radiologist label -> canonical class)
+CREATE TABLE diagnosis_synonyms (
+    raw TEXT PRIMARY KEY, -- lowercase label as emitted by the models
+    canonical TEXT NOT NULL
+);
+
+INSERT INTO diagnosis_synonyms (raw, canonical) VALUES
+    ('normal', 'normal'),
+    ('no finding', 'normal'),
+    ('negative', 'normal'),
+    ('tuberculosis', 'tuberculosis'),
+    ('tb', 'tuberculosis'),
+    ('positive', 'tuberculosis'),
+    ('adenocarcinoma', 'lung_cancer'),
+    ('squamous_cell_carcinoma', 'lung_cancer'),
+    ('squamous_cell', 'lung_cancer'),
+    ('large_cell_carcinoma', 'lung_cancer'),
+    ('large_cell', 'lung_cancer'),
+    ('lung_cancer', 'lung_cancer'),
+    ('malignant', 'lung_cancer'),
+    ('benign', 'lung_cancer'),
+    ('inconclusive', 'inconclusive'),
+    ('uncertain', 'inconclusive'),
+    ('unknown', 'inconclusive');
 
 -- GRAD-CAM VISUALIZATIONS
 CREATE TABLE gradcam_outputs (
@@ -184,7 +217,7 @@ CREATE TABLE gradcam_outputs (
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
 
-CREATE INDEX idx_gradcam_outputs_prediction_id ON gradcam_outputs(ai_prediction_id);
+CREATE INDEX idx_gradcam_outputs_prediction_created ON gradcam_outputs(ai_prediction_id, created_at DESC);
 CREATE INDEX idx_gradcam_outputs_scan_image_id ON gradcam_outputs(scan_image_id);
 
 -- RADIOLOGIST FEEDBACK & OVERRIDES
@@ -222,6 +255,7 @@ CREATE INDEX idx_radiologist_feedback_scan_id ON radiologist_feedback(scan_id);
 CREATE INDEX idx_radiologist_feedback_radiologist_id ON radiologist_feedback(radiologist_id);
 CREATE INDEX idx_radiologist_feedback_type ON radiologist_feedback(feedback_type);
 CREATE INDEX idx_radiologist_feedback_timestamp ON radiologist_feedback(feedback_timestamp DESC);
+CREATE INDEX idx_radiologist_feedback_overrides ON radiologist_feedback(feedback_timestamp DESC) WHERE feedback_type IN ('partial_override', 'full_override');
 
 -- REPORTS
 CREATE TYPE report_status AS ENUM ('draft', 'pending_review', 'approved', 'published', 'revised', 'archived');
@@ -266,10 +300,11 @@ CREATE TABLE reports (
     edit_history JSONB -- Track all edits made to the report
 );
 
-CREATE INDEX idx_reports_scan_id ON reports(scan_id);
 CREATE INDEX idx_reports_status ON reports(report_status);
 CREATE INDEX idx_reports_created_by ON reports(created_by_radiologist_id);
 CREATE INDEX idx_reports_published_at ON reports(published_at DESC);
+CREATE INDEX idx_reports_scan_published ON reports(scan_id, published_at DESC) WHERE report_status = 'published';
+CREATE INDEX idx_reports_scan_created ON reports(scan_id, created_at DESC);
 
 -- REPORT PUBLICATION STATUS
 CREATE TABLE report_publications (
@@ -66,12 +66,11 @@ const RadiologistPortal = () => {
   const fetchData = async () => {
     setLoading(true);
     try {
+      // Load every page so no part of the worklist is left out
       if (activeTab === 'pending') {
-        const response = await radiologistService.getPendingScans();
-        setScans(response.data);
+        setScans(await radiologistService.getAllPendingScans<Scan>());
       } else if (activeTab === 'completed') {
-        const response = await radiologistService.getCompletedScans();
-        setScans(response.data);
+        setScans(await radiologistService.getAllCompletedScans<Scan>());
       } else if (activeTab === 'profile') {
         const response = await radiologistService.getProfile();
         setProfile(response.data);
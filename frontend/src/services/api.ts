@@ -73,11 +73,32 @@ interface ReportData {
   recommendations?: string;
 }
 
+// Follow a keyset-paginated list's next_cursor until it runs out
+const fetchAllPages = async <T>(url: string, size = 200): Promise<T[]> => {
+  const items: T[] = [];
+  let cursor: string | undefined;
+  do {
+    const response = await api.get(url, { params: { size, cursor } });
+    items.push(...response.data.items);
+    cursor = response.data.next_cursor ?? undefined;
+  } while (cursor);
+  return items;
+};
+
 export const radiologistService = {
   // Scans
-  getPendingScans: () => api.get('/radiologist/scans/pending'),
-  getCompletedScans: () => api.get('/radiologist/scans/completed'),
+  // Keyset-paginated: responses are { items, next_cursor, size }; pass
+  // next_cursor back for the following page (null on the last one)
+  getPendingScans: (cursor?: string, size = 200) =>
+    api.get('/radiologist/scans/pending', { params: { size, cursor } }),
+  getCompletedScans: (cursor?: string, size = 200) =>
+    api.get('/radiologist/scans/completed', { params: { size, cursor } }),
+  // Every page, for views that show the whole worklist
+  getAllPendingScans: <T>() => fetchAllPages<T>('/radiologist/scans/pending'),
+  getAllCompletedScans: <T>() => fetchAllPages<T>('/radiologist/scans/completed'),
   getScanById: (scanId: string) => api.get(`/radiologist/scans/${scanId}`),
+  getScansByIds: (scanIds: string[]) =>
+    api.get('/radiologist/scans/batch', { params: { ids: scanIds.join(',') } }),
   
   // Images - included in scan details
   getScanImages: async (scanId: string) => {